@@ -0,0 +1,164 @@
+""" Throughput and memory of ContactImport against a local fake Chatwoot.
+
+Writes a CSV of `--rows` rows for each size, repeating `--distinct`
+contacts if given, a share (`--existing`) of which the fake server already
+holds (a quarter of those with a different plan), and imports it with
+`ContactImport`. Every import runs in
+a fresh process, so the peak RSS it reports belongs to that import alone.
+The server answers after `--latency` seconds.
+
+    python bench/contact_import.py --rows 10000 100000 --concurrency 8
+    python bench/contact_import.py --rows 10000 100000 --distinct 10000
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import socket
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from woot import Chatwoot
+from woot.contact_import import ContactImport
+
+PAGE_SIZE = 15
+
+
+def get_existing(rows, existing):
+    count = int(rows * existing)
+    return [
+        {
+            "id": index + 1,
+            "name": f"Contact {index}",
+            "email": f"contact{index}@example.com",
+            "phone_number": None,
+            "custom_attributes": {"plan": "pro" if index % 2 else "free"},
+        }
+        for index in range(count)
+    ]
+
+
+def serve(port, contacts, existing, latency):
+    contacts = get_existing(contacts, existing)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # headers and body go out in separate writes
+        disable_nagle_algorithm = True
+
+        def reply(self, body):
+            content = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def read_body(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        def do_GET(self):
+            page = int(self.path.partition("page=")[2].partition("&")[0] or 1)
+            start = (page - 1) * PAGE_SIZE
+            self.reply(
+                {
+                    "meta": {"count": len(contacts)},
+                    "payload": contacts[start : start + PAGE_SIZE],
+                }
+            )
+
+        def do_POST(self):
+            self.read_body()
+            time.sleep(latency)
+            self.reply({"payload": {"contact": {"id": 10**9}}})
+
+        def do_PATCH(self):
+            self.read_body()
+            time.sleep(latency)
+            self.reply({"id": 1})
+
+        do_PUT = do_PATCH
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    server.serve_forever()
+
+
+def write_csv(path, rows, distinct):
+    with open(path, "w") as file:
+        file.write("name,email,plan\n")
+        for row in range(rows):
+            index = row % distinct
+            # every fourth contact comes with another plan
+            plan = "pro" if index % 2 else "free"
+            if index % 4 == 3:
+                plan = "enterprise"
+            file.write(f"Contact {index},contact{index}@example.com,{plan}\n")
+
+
+def run_import(url, path, concurrency, results):
+    with Chatwoot(url, "token") as chatwoot:
+        stats = ContactImport(
+            chatwoot, account_id=1, inbox_id=1, path=path, concurrency=concurrency
+        ).run()
+    # kilobytes on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put((dict(stats), peak))
+
+
+def get_free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--distinct", type=int, default=None)
+    parser.add_argument("--existing", type=float, default=0.2)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    print("rows      rows/s   peak RSS   created  updated  unchanged  duplicate")
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.rows:
+            distinct = args.distinct or rows
+            port = get_free_port()
+            server = context.Process(
+                target=serve,
+                args=(port, distinct, args.existing, args.latency),
+                daemon=True,
+            )
+            server.start()
+            path = os.path.join(directory, f"contacts-{rows}.csv")
+            write_csv(path, rows, distinct)
+            time.sleep(0.5)
+            results = context.Queue()
+            worker = context.Process(
+                target=run_import,
+                args=(f"http://127.0.0.1:{port}", path, args.concurrency, results),
+            )
+            try:
+                worker.start()
+                stats, peak = results.get()
+                worker.join()
+            finally:
+                server.terminate()
+            print(
+                f"{rows:<8}  {stats['rows_per_second']:>6}   {peak / 1024:>6.1f}MB"
+                f"   {stats.get('created', 0):>7}  {stats.get('updated', 0):>7}"
+                f"  {stats.get('unchanged', 0):>9}  {stats.get('duplicate', 0):>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+""" Throughput versus concurrency of AsyncChatwoot over HTTP/1.1 and HTTP/2.
+
+Starts a local h2-capable stand-in server (hypercorn over TLS with a
+throwaway self-signed certificate) answering `messages.list` after
+`--latency` seconds and sends up to `--requests` calls at each concurrency, once
+with `http2=False` and once with `http2=True`. Reports requests per second
+and how many connections the server saw.
+
+    pip install "woot[http2]" hypercorn
+    python bench/http2.py --latency 0.02 --concurrency 1 10 50 100 200 500
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import subprocess
+import tempfile
+import time
+
+from woot import AsyncChatwoot
+
+BODY = b'{"payload": [{"id": 1, "content": "hello"}]}'
+
+
+def make_certificate(directory):
+    certfile = os.path.join(directory, "cert.pem")
+    keyfile = os.path.join(directory, "key.pem")
+    subprocess.run(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=localhost",
+            "-keyout",
+            keyfile,
+            "-out",
+            certfile,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return certfile, keyfile
+
+
+def serve(port, certfile, keyfile, latency, connections):
+    from hypercorn.asyncio import serve as hypercorn_serve
+    from hypercorn.config import Config
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                else:
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["path"] == "/connections":
+            body = str(len(connections)).encode()
+            connections.clear()
+        else:
+            connections.add(scope["client"])
+            await asyncio.sleep(latency)
+            body = BODY
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    config = Config()
+    config.bind = [f"127.0.0.1:{port}"]
+    config.certfile = certfile
+    config.keyfile = keyfile
+    config.alpn_protocols = ["h2", "http/1.1"]
+    config.h2_max_concurrent_streams = 1000
+    config.keep_alive_max_requests = 10**9
+    config.backlog = 1000
+    config.accesslog = None
+    config.errorlog = None
+    asyncio.run(hypercorn_serve(app, config))
+
+
+async def run(url, http2, concurrency, requests):
+    async with AsyncChatwoot(
+        url, "token", http2=http2, ssl_verify=False, timeout=60
+    ) as chatwoot:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call():
+            async with semaphore:
+                await chatwoot.messages.list(account_id=1, conversation_id=1)
+
+        # warm up, so connection setup isn't part of the measurement
+        await asyncio.gather(*[call() for _ in range(concurrency)])
+        await chatwoot._client.get(url + "/connections")
+        started = time.perf_counter()
+        await asyncio.gather(*[call() for _ in range(requests)])
+        elapsed = time.perf_counter() - started
+        response = await chatwoot._client.get(url + "/connections")
+        return requests / elapsed, int(response.text)
+
+
+def get_free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 10, 50, 100, 200, 500]
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        certfile, keyfile = make_certificate(directory)
+        port = get_free_port()
+        server = multiprocessing.Process(
+            target=serve,
+            args=(port, certfile, keyfile, args.latency, set()),
+            daemon=True,
+        )
+        server.start()
+        time.sleep(1.0)
+        url = f"https://127.0.0.1:{port}"
+        try:
+            print(
+                f"latency {args.latency * 1000:.0f}ms, up to {args.requests} requests a run"
+            )
+            print("concurrency   HTTP/1.1 req/s (conns)   HTTP/2 req/s (conns)")
+            for concurrency in args.concurrency:
+                # low concurrency is latency bound, keep those runs short
+                requests = min(args.requests, concurrency * 50)
+                http1 = asyncio.run(run(url, False, concurrency, requests))
+                http2 = asyncio.run(run(url, True, concurrency, requests))
+                print(
+                    f"{concurrency:>11}   {http1[0]:>14.0f} ({http1[1]:>4})"
+                    f"   {http2[0]:>12.0f} ({http2[1]:>4})"
+                )
+        finally:
+            server.terminate()
+
+
+if __name__ == "__main__":
+    main()
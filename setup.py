@@ -34,4 +34,7 @@ setup(
         "python-status",
         "pydantic",
     ],
+    extras_require={
+        "http2": ["httpx[http2]"],
+    },
 )
@@ -1 +1,9 @@
 from woot.api import Chatwoot, AsyncChatwoot
+from woot.simple_rest_client.retry import RetryPolicy
+from woot.simple_rest_client.ratelimit import RateLimiter
+from woot.simple_rest_client.concurrency import AdaptiveConcurrencyLimiter
+from woot.simple_rest_client.circuit import CircuitBreakerRegistry
+from woot.simple_rest_client.hedging import HedgingPolicy
+from woot.simple_rest_client.cache import ResponseCache
+from woot.simple_rest_client.singleflight import SingleFlight
+from woot.simple_rest_client.http_cache import HTTPCache, SQLiteCacheStore
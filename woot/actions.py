@@ -11,7 +11,7 @@ class WootAction:
         return getattr(self, item)
 
 
-@dataclass
+@dataclass(frozen=True)
 class Action(WootAction):
     method: str
     url: str
@@ -541,6 +541,7 @@ class MessagesActions:
         default_factory=lambda: action_factory(
             method="GET",
             url="api/v1/accounts/{account_id}/conversations/{conversation_id}/messages",
+            query=ws.ApiV1AccountsAccountIdConversationsConversationIdMessagesGetParametersQuery,
         )
     )
     create: Action = field(
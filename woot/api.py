@@ -1,7 +1,11 @@
 """ Chatwoot API wrapper is here."""
 
 from abc import abstractproperty
+
+import httpx
+
 from woot.simple_rest_client.api import API
+from woot.simple_rest_client.deadline import Deadline
 
 import woot.resources as wr
 from woot.utils import get_account_name
@@ -13,6 +17,23 @@ class _BaseChatwoot:
         self._access_key = access_key
         self._timeout = kwargs.get("timeout", 60)
         self._json_encode_body = kwargs.get("json_encode_body", True)
+        self._ssl_verify = kwargs.get("ssl_verify", True)
+        self._limits = httpx.Limits(
+            max_connections=kwargs.get("max_connections", 100),
+            max_keepalive_connections=kwargs.get("max_keepalive_connections", 20),
+            keepalive_expiry=kwargs.get("keepalive_expiry", 5.0),
+        )
+        self._http2 = kwargs.get("http2", False)
+        self._transport = kwargs.get("transport")
+        self._retry = kwargs.get("retry")
+        self._rate_limiter = kwargs.get("rate_limiter")
+        self._concurrency_limiter = kwargs.get("concurrency_limiter")
+        self._circuit_breakers = kwargs.get("circuit_breakers")
+        self._hedging = kwargs.get("hedging")
+        self._cache = kwargs.get("cache")
+        self._singleflight = kwargs.get("singleflight")
+        self._http_cache = kwargs.get("http_cache")
+        self._client = self._create_client()
 
         self._api = API(
             api_root_url=self._chatwoot_url,
@@ -20,8 +41,25 @@ class _BaseChatwoot:
             headers={"api_access_token": f"{self._access_key}"},
             timeout=self._timeout,
             json_encode_body=self._json_encode_body,
+            ssl_verify=self._ssl_verify,
+            client=self._client,
+            limits=self._limits,
+            http2=self._http2,
+            transport=self._transport,
+            retry=self._retry,
+            rate_limiter=self._rate_limiter,
+            concurrency_limiter=self._concurrency_limiter,
+            circuit_breakers=self._circuit_breakers,
+            hedging=self._hedging,
+            cache=self._cache,
+            singleflight=self._singleflight,
+            http_cache=self._http_cache,
         )
         self._add_resources()
+        self._set_action_retry(kwargs.get("action_retry", {}))
+
+    def _create_client(self):
+        raise NotImplementedError
 
     def _add_resources(self):
         for resource in self.resources:
@@ -40,6 +78,23 @@ class _BaseChatwoot:
         def resources(self):
             pass
 
+    def deadline(self, timeout):
+        """Time budget in seconds shared by every request made in the block.
+
+        with chatwoot.deadline(2.0):
+            chatwoot.conversations.get(account_id=1, conversation_id=1)
+            chatwoot.messages.list(account_id=1, conversation_id=1)
+        """
+        return Deadline(timeout)
+
+    def _set_action_retry(self, action_retry):
+        # per-action overrides, e.g. {"messages.create": RetryPolicy(...)}
+        for path, policy in action_retry.items():
+            resource_name, action_name = path.split(".")
+            resource = getattr(self, resource_name)
+            resource.get_action(action_name)
+            resource.action_retry[action_name] = policy
+
     def __repr__(self):
         resource_names = [get_account_name(resource) for resource in self.resources]
         max_len = max([len(name) for name in resource_names]) + 2
@@ -57,12 +112,93 @@ class _BaseChatwoot:
 
 
 class Chatwoot(_BaseChatwoot):
+    """Sync Chatwoot client.
+
+    All resources share one pooled `httpx.Client` (tune it with
+    `max_connections`, `max_keepalive_connections` and `keepalive_expiry`).
+    The pool is thread-safe, so a single instance can be used from every
+    thread of a multi-threaded worker.
+
+    Pass `transport=` to route requests through any `httpx.BaseTransport`,
+    e.g. `httpx.HTTPTransport(uds="/run/proxy.sock")` for a unix socket,
+    `httpx.WSGITransport(app=...)` or `httpx.MockTransport(handler)`.
+
+    Close it with `chatwoot.close()` or use it as a context manager:
+
+        with Chatwoot(chatwoot_url=..., access_key=...) as chatwoot:
+            chatwoot.conversations.list(account_id=1)
+    """
+
     @property
     def resources(self):
         return wr._ALL_RESOURCES
 
+    def _create_client(self):
+        return httpx.Client(
+            verify=self._ssl_verify,
+            limits=self._limits,
+            http2=self._http2,
+            transport=self._transport,
+        )
+
+    def close(self):
+        self._client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
 
 class AsyncChatwoot(_BaseChatwoot):
+    """Async Chatwoot client.
+
+    All resources share one long-lived `httpx.AsyncClient`, so connections are
+    kept alive between requests and concurrent calls (e.g. `asyncio.gather`)
+    are served from the same pool. Requests are built per call without
+    touching shared state, so one instance can serve any number of
+    concurrent tasks. Pool size is controlled with
+    `max_connections`, `max_keepalive_connections` and `keepalive_expiry`.
+    With `http2=True` (requires `pip install woot[http2]`) concurrent
+    requests are multiplexed over a few HTTP/2 connections instead of
+    opening one socket per in-flight request.
+
+    Pass `transport=` to route requests through any
+    `httpx.AsyncBaseTransport`, e.g. `httpx.AsyncHTTPTransport(uds=...)`,
+    `httpx.ASGITransport(app=...)` or `httpx.MockTransport(handler)`.
+
+    Pass `concurrency_limiter=AdaptiveConcurrencyLimiter()` to cap in-flight
+    requests with a limit that adapts to the server's health, and
+    `hedging=HedgingPolicy()` to hedge slow GET requests. Hedging can also
+    be enabled for a single resource, e.g.
+    `chatwoot.conversations.hedging = HedgingPolicy()`. With
+    `singleflight=SingleFlight()` identical GETs made at the same time share
+    one request.
+
+    Close it with `await chatwoot.aclose()` or use it as a context manager:
+
+        async with AsyncChatwoot(chatwoot_url=..., access_key=...) as chatwoot:
+            await chatwoot.conversations.list(account_id=1)
+    """
+
     @property
     def resources(self):
         return wr._ALL_ASYNC_RESOURCES
+
+    def _create_client(self):
+        return httpx.AsyncClient(
+            verify=self._ssl_verify,
+            limits=self._limits,
+            http2=self._http2,
+            transport=self._transport,
+        )
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
@@ -0,0 +1,153 @@
+""" Send one templated message to many conversations."""
+
+import json
+import time
+from collections import Counter
+from string import Template
+
+from woot.bulk import Bulk
+from woot.simple_rest_client.ratelimit import TokenBucket
+
+
+def get_variables(conversation):
+    """Template variables available for every conversation."""
+    if not isinstance(conversation, dict):
+        return {"conversation_id": conversation}
+    sender = (conversation.get("meta") or {}).get("sender") or {}
+    return {
+        "conversation_id": conversation["id"],
+        "contact_name": sender.get("name") or "",
+        "contact_email": sender.get("email") or "",
+        "contact_phone": sender.get("phone_number") or "",
+    }
+
+
+class Broadcast:
+    """Send a message built from `template` to a set of conversations.
+
+    The conversations are either given as ids (or conversation dicts) in
+    `conversations`, or selected with the conversation list filters passed
+    as keyword arguments. The template is a `string.Template` compiled once,
+    `$contact_name`, `$conversation_id` etc. are filled in from the
+    conversation, `variables(conversation)` can return more of them.
+
+    Up to `concurrency` messages are in flight and no more than `rate`
+    messages per second are sent. A conversation gets the message at most
+    once per run. The outcome for every conversation is appended to
+    `report_path` as JSONL, `run()` returns the counters.
+
+        Broadcast(
+            chatwoot, account_id=1, template="Hi $contact_name, we're down.",
+            rate=20, status="open",
+        ).run()
+    """
+
+    def __init__(
+        self,
+        chatwoot,
+        account_id,
+        template,
+        conversations=None,
+        variables=None,
+        rate=10.0,
+        concurrency=16,
+        report_path=None,
+        message_type="outgoing",
+        private=False,
+        **conversation_query,
+    ):
+        self.chatwoot = chatwoot
+        self.account_id = account_id
+        self.template = Template(template)
+        self.conversations = conversations
+        self.variables = variables
+        self.bucket = TokenBucket(rate, max(int(rate), 1))
+        self.concurrency = concurrency
+        self.report_path = report_path
+        self.message_type = message_type
+        self.private = private
+        self.conversation_query = conversation_query
+        self.stats = Counter()
+
+    def select(self):
+        if self.conversations is not None:
+            return iter(self.conversations)
+        return self.chatwoot.conversations.iter_list(
+            account_id=self.account_id, **self.conversation_query
+        )
+
+    def render(self, conversation):
+        variables = get_variables(conversation)
+        if self.variables is not None:
+            variables.update(self.variables(conversation))
+        return self.template.substitute(variables)
+
+    def plan(self, report):
+        """Render the message for every selected conversation, once per id."""
+        sent = set()
+        for conversation in self.select():
+            self.stats["selected"] += 1
+            conversation_id = get_variables(conversation)["conversation_id"]
+            if conversation_id in sent:
+                self.write_report(report, conversation_id, "duplicate")
+                continue
+            sent.add(conversation_id)
+            try:
+                content = self.render(conversation)
+            except (KeyError, ValueError) as exc:
+                self.write_report(
+                    report, conversation_id, "invalid", error=f"template: {exc}"
+                )
+                continue
+            yield {"conversation_id": conversation_id, "content": content}
+
+    def send(self, conversation_id, content):
+        wait = self.bucket.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return self.chatwoot.messages.create(
+            account_id=self.account_id,
+            conversation_id=conversation_id,
+            content=content,
+            message_type=self.message_type,
+            private=self.private,
+        )
+
+    def write_report(
+        self, report, conversation_id, outcome, message_id=None, error=None
+    ):
+        self.stats[outcome] += 1
+        if report is None:
+            return
+        entry = {
+            "conversation_id": conversation_id,
+            "outcome": outcome,
+            "message_id": message_id,
+        }
+        if error is not None:
+            entry["error"] = error
+        report.write(json.dumps(entry) + "\n")
+
+    def run(self):
+        started = time.monotonic()
+        report = open(self.report_path, "a") if self.report_path else None
+        try:
+            messages = Bulk(self.send, self.plan(report), concurrency=self.concurrency)
+            for kwargs, result in messages:
+                if isinstance(result, Exception):
+                    self.write_report(
+                        report, kwargs["conversation_id"], "failed", error=str(result)
+                    )
+                    continue
+                body = result.body if isinstance(result.body, dict) else {}
+                self.write_report(
+                    report, kwargs["conversation_id"], "sent", message_id=body.get("id")
+                )
+        finally:
+            if report is not None:
+                report.close()
+        elapsed = time.monotonic() - started
+        self.stats["messages_per_second"] = (
+            int(self.stats["sent"] / elapsed) if elapsed else 0
+        )
+        return self.stats
@@ -0,0 +1,137 @@
+""" Run one action for many inputs with bounded concurrency."""
+
+import asyncio
+import contextvars
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class _BaseBulk:
+    def __init__(self, action_method, kwargs_iterable, concurrency=8, ordered=False):
+        self.action_method = action_method
+        self.kwargs_iterable = kwargs_iterable
+        self.concurrency = concurrency
+        self.ordered = ordered
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    @property
+    def completed(self):
+        return self.succeeded + self.failed
+
+    @property
+    def in_flight(self):
+        return self.submitted - self.completed
+
+    def _count(self, outcome):
+        if isinstance(outcome, Exception):
+            self.failed += 1
+        else:
+            self.succeeded += 1
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(submitted={self.submitted}, "
+            f"succeeded={self.succeeded}, failed={self.failed})"
+        )
+
+
+class Bulk(_BaseBulk):
+    """Call an action once per kwargs dict using a pool of threads.
+
+    Inputs are consumed lazily, only `concurrency` calls are in flight at a
+    time. Iterating yields `(kwargs, response_or_exception)` in completion
+    order, or in input order with `ordered=True`; errors don't stop the run.
+    `submitted`, `succeeded`, `failed`, `completed` and `in_flight` can be
+    read while iterating.
+    """
+
+    def _call(self, kwargs):
+        try:
+            return self.action_method(**kwargs)
+        except Exception as exc:
+            return exc
+
+    def __iter__(self):
+        inputs = iter(self.kwargs_iterable)
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        pending = deque()
+
+        def submit():
+            kwargs = next(inputs, None)
+            if kwargs is None:
+                return False
+            # keep deadlines and other context in the worker threads
+            context = contextvars.copy_context()
+            future = executor.submit(context.run, self._call, kwargs)
+            pending.append((kwargs, future))
+            self.submitted += 1
+            return True
+
+        try:
+            while len(pending) < self.concurrency and submit():
+                pass
+            while pending:
+                if self.ordered:
+                    kwargs, future = pending.popleft()
+                    future.result()
+                else:
+                    wait([f for _, f in pending], return_when=FIRST_COMPLETED)
+                    kwargs, future = next(p for p in pending if p[1].done())
+                    pending.remove((kwargs, future))
+                outcome = future.result()
+                self._count(outcome)
+                submit()
+                yield kwargs, outcome
+        finally:
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+
+class AsyncBulk(_BaseBulk):
+    """Async version of `Bulk`, runs up to `concurrency` tasks at a time.
+
+    async for kwargs, result in resource.bulk("create", rows, concurrency=20):
+        ...
+    """
+
+    async def _call(self, kwargs):
+        try:
+            return await self.action_method(**kwargs)
+        except Exception as exc:
+            return exc
+
+    async def __aiter__(self):
+        inputs = iter(self.kwargs_iterable)
+        pending = deque()
+
+        def submit():
+            kwargs = next(inputs, None)
+            if kwargs is None:
+                return False
+            pending.append((kwargs, asyncio.ensure_future(self._call(kwargs))))
+            self.submitted += 1
+            return True
+
+        try:
+            while len(pending) < self.concurrency and submit():
+                pass
+            while pending:
+                if self.ordered:
+                    kwargs, task = pending.popleft()
+                    await task
+                else:
+                    await asyncio.wait(
+                        [t for _, t in pending], return_when=asyncio.FIRST_COMPLETED
+                    )
+                    kwargs, task = next(p for p in pending if p[1].done())
+                    pending.remove((kwargs, task))
+                outcome = task.result()
+                self._count(outcome)
+                submit()
+                yield kwargs, outcome
+        finally:
+            for _, task in pending:
+                task.cancel()
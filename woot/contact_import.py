@@ -0,0 +1,248 @@
+""" Streaming import of contacts from CSV or JSONL files."""
+
+import csv
+import json
+import re
+import time
+from collections import Counter
+
+from woot.bulk import Bulk
+
+CONTACT_FIELDS = ("name", "email", "phone_number", "identifier", "avatar_url")
+
+
+def normalize_email(email):
+    email = str(email if email is not None else "").strip().lower()
+    return email or None
+
+
+def normalize_phone(phone, default_country_code=None):
+    """Bring a phone number to `+<digits>` form, as Chatwoot expects."""
+    phone = str(phone if phone is not None else "").strip()
+    if not phone:
+        return None
+    digits = re.sub(r"\D", "", phone)
+    if not digits:
+        return None
+    if phone.startswith("+"):
+        return "+" + digits
+    if digits.startswith("00"):
+        return "+" + digits[2:]
+    if default_country_code:
+        return "+" + str(default_country_code).lstrip("+") + digits.lstrip("0")
+    return digits
+
+
+def same_value(stored, value):
+    # CSV cells are strings, the stored value may be a number
+    if isinstance(value, str) and isinstance(stored, (int, float)):
+        return str(stored) == value
+    return stored == value
+
+
+def parse_custom_attributes(value):
+    # CSV cells hold the attributes as a JSON object
+    if isinstance(value, str):
+        value = json.loads(value) if value.strip() else {}
+    if not isinstance(value, dict):
+        raise ValueError("custom_attributes is not an object")
+    return dict(value)
+
+
+def iter_rows(path):
+    """Yield rows of a CSV or JSONL (.jsonl, .ndjson) file one by one.
+
+    A JSONL line that can't be parsed is yielded as the exception, so it
+    only fails its own row.
+    """
+    with open(path, newline="") as file:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in file:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError as exc:
+                        yield exc
+        else:
+            yield from csv.DictReader(file)
+
+
+def get_contact_id(body):
+    # create returns {"payload": {"contact": {...}}}, older versions the contact
+    payload = body.get("payload", body) if isinstance(body, dict) else {}
+    contact = payload.get("contact", payload) if isinstance(payload, dict) else {}
+    return contact.get("id") if isinstance(contact, dict) else None
+
+
+class ContactImport:
+    """Create or update contacts from a CSV or JSONL file.
+
+    Rows are read one at a time, email and phone number are normalized and
+    matched against an index of the account's existing contacts, which is
+    prefetched once. Rows seen before in the same file are skipped, rows
+    whose values the existing contact already holds are left alone, and
+    only the remaining creates and updates are sent, `concurrency` at a
+    time. CSV columns other than the contact fields go to
+    `custom_attributes`, a `custom_attributes` column may hold a JSON
+    object. A row that can't be read is logged as `invalid` and the import
+    goes on.
+
+    Memory depends on the number of distinct contacts, not on the size of
+    the file. Every row's outcome is appended to `log_path` as JSONL and
+    `run()` returns the counters, including `rows_per_second`.
+    """
+
+    def __init__(
+        self,
+        chatwoot,
+        account_id,
+        inbox_id,
+        path,
+        log_path=None,
+        concurrency=8,
+        default_country_code=None,
+    ):
+        self.chatwoot = chatwoot
+        self.account_id = account_id
+        self.inbox_id = inbox_id
+        self.path = path
+        self.log_path = log_path or path + ".log.jsonl"
+        self.concurrency = concurrency
+        self.default_country_code = default_country_code
+        self.index = {}
+        self.stats = Counter()
+
+    def normalize(self, row):
+        if isinstance(row, Exception):
+            raise row
+        if not isinstance(row, dict):
+            raise ValueError("row is not an object")
+        contact = {}
+        custom_attributes = parse_custom_attributes(row.get("custom_attributes") or {})
+        for key, value in row.items():
+            # rows with more cells than the CSV header have them under None
+            if key in (None, "custom_attributes") or value in (None, ""):
+                continue
+            if key in CONTACT_FIELDS:
+                contact[key] = value.strip() if isinstance(value, str) else value
+            else:
+                custom_attributes[key] = value
+        contact["email"] = normalize_email(contact.get("email"))
+        contact["phone_number"] = normalize_phone(
+            contact.get("phone_number"), self.default_country_code
+        )
+        if custom_attributes:
+            contact["custom_attributes"] = custom_attributes
+        return {k: v for k, v in contact.items() if v is not None}
+
+    @staticmethod
+    def get_keys(contact):
+        return [
+            f"{field}:{contact[field]}"
+            for field in ("email", "phone_number", "identifier")
+            if contact.get(field)
+        ]
+
+    @staticmethod
+    def get_stored_values(contact):
+        """The values of a contact that rows are compared against."""
+        values = {
+            field: contact[field]
+            for field in CONTACT_FIELDS
+            if contact.get(field) is not None
+        }
+        if contact.get("custom_attributes"):
+            values["custom_attributes"] = dict(contact["custom_attributes"])
+        return values
+
+    @staticmethod
+    def is_unchanged(stored, contact):
+        """Whether the contact already holds every value the row has.
+
+        Fields and custom attributes missing from the row don't count, a
+        file may have fewer columns than Chatwoot keeps.
+        """
+        for field, value in contact.items():
+            if field == "custom_attributes":
+                attributes = stored.get("custom_attributes") or {}
+                if any(not same_value(attributes.get(k), v) for k, v in value.items()):
+                    return False
+            elif not same_value(stored.get(field), value):
+                return False
+        return True
+
+    def load_index(self):
+        for contact in self.chatwoot.contacts.iter_list(account_id=self.account_id):
+            contact = {
+                **contact,
+                "email": normalize_email(contact.get("email")),
+                "phone_number": normalize_phone(contact.get("phone_number")),
+            }
+            entry = (contact["id"], self.get_stored_values(contact))
+            for key in self.get_keys(contact):
+                self.index.setdefault(key, entry)
+
+    def plan(self, log):
+        """Decide what to do with every row, yield the calls that are needed."""
+        seen = set()
+        for line, row in enumerate(iter_rows(self.path), start=1):
+            self.stats["rows"] += 1
+            try:
+                contact = self.normalize(row)
+            except Exception as exc:
+                self.write_log(log, line, "invalid", error=str(exc))
+                continue
+            keys = self.get_keys(contact)
+            if not keys:
+                self.write_log(log, line, "invalid", error="no email, phone or id")
+                continue
+            if seen.intersection(keys):
+                self.write_log(log, line, "duplicate")
+                continue
+            seen.update(keys)
+            existing = next((self.index[k] for k in keys if k in self.index), None)
+            if existing is None:
+                yield {"line": line, "keys": keys, "contact": contact}
+            elif self.is_unchanged(existing[1], contact):
+                self.write_log(log, line, "unchanged", contact_id=existing[0])
+            else:
+                yield {"line": line, "contact_id": existing[0], "contact": contact}
+
+    def apply(self, line, contact, keys=None, contact_id=None):
+        if contact_id is None:
+            response = self.chatwoot.contacts.create(
+                account_id=self.account_id, inbox_id=self.inbox_id, **contact
+            )
+            return "created", get_contact_id(response.body)
+        self.chatwoot.contacts.update(
+            account_id=self.account_id, id=contact_id, **contact
+        )
+        return "updated", contact_id
+
+    def write_log(self, log, line, outcome, contact_id=None, error=None):
+        self.stats[outcome] += 1
+        entry = {"line": line, "outcome": outcome, "contact_id": contact_id}
+        if error is not None:
+            entry["error"] = error
+        log.write(json.dumps(entry) + "\n")
+
+    def run(self):
+        started = time.monotonic()
+        self.load_index()
+        with open(self.log_path, "w") as log:
+            calls = Bulk(self.apply, self.plan(log), concurrency=self.concurrency)
+            for kwargs, result in calls:
+                if isinstance(result, Exception):
+                    self.write_log(log, kwargs["line"], "failed", error=str(result))
+                    continue
+                outcome, contact_id = result
+                if outcome == "created" and contact_id is not None:
+                    entry = (contact_id, kwargs["contact"])
+                    for key in kwargs["keys"]:
+                        self.index[key] = entry
+                self.write_log(log, kwargs["line"], outcome, contact_id=contact_id)
+        elapsed = time.monotonic() - started
+        self.stats["rows_per_second"] = (
+            int(self.stats["rows"] / elapsed) if elapsed else 0
+        )
+        return self.stats
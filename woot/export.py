@@ -0,0 +1,180 @@
+""" Resumable export of a whole account to JSONL files."""
+
+import json
+import os
+
+from woot.pagination import get_page_items, is_last_page
+
+CONTACTS = "contacts.jsonl"
+CONVERSATIONS = "conversations.jsonl"
+MESSAGES = "messages.jsonl"
+CHECKPOINT = "checkpoint.json"
+
+
+def get_activity(record):
+    return record.get("last_activity_at") or record.get("timestamp") or 0
+
+
+class AccountExport:
+    """Stream contacts, conversations and their messages to JSONL files.
+
+    Only one page is held in memory at a time. Progress (last finished page,
+    last exported conversation and the size of every file) is written to
+    `checkpoint.json` after each page and conversation, so a killed export
+    started again with the same directory resumes where it stopped; anything
+    written after the last checkpoint is cut off first.
+
+    With `incremental=True`, after a completed run only conversations whose
+    `last_activity_at` moved past the previous run's watermark are appended,
+    together with their messages created after it. Contacts are always
+    exported in full. Readers should keep the last line seen for every id.
+
+        AccountExport(chatwoot, account_id=1, directory="export").run()
+    """
+
+    def __init__(
+        self, chatwoot, account_id, directory, incremental=False, **conversation_query
+    ):
+        self.chatwoot = chatwoot
+        self.account_id = account_id
+        self.directory = directory
+        self.incremental = incremental
+        self.conversation_query = {"status": "all", **conversation_query}
+        self.state = None
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def load_checkpoint(self):
+        try:
+            with open(self.path(CHECKPOINT)) as checkpoint:
+                return json.load(checkpoint)
+        except FileNotFoundError:
+            return None
+
+    def save_checkpoint(self, files):
+        for name, file in files.items():
+            file.flush()
+            self.state["offsets"][name] = file.tell()
+        tmp_path = self.path(CHECKPOINT + ".tmp")
+        with open(tmp_path, "w") as checkpoint:
+            json.dump(self.state, checkpoint)
+        os.replace(tmp_path, self.path(CHECKPOINT))
+
+    def new_run(self, previous):
+        watermark = None
+        offsets = {CONTACTS: 0, CONVERSATIONS: 0, MESSAGES: 0}
+        if self.incremental and previous is not None:
+            watermark = previous["watermark"]
+            offsets[CONVERSATIONS] = previous["offsets"][CONVERSATIONS]
+            offsets[MESSAGES] = previous["offsets"][MESSAGES]
+        return {
+            "status": "running",
+            "watermark": watermark,
+            "next_watermark": watermark,
+            "contacts": {"page": 0, "page_size": None, "done": False},
+            "conversations": {
+                "page": 0,
+                "page_size": None,
+                "last_conversation_id": None,
+                "done": False,
+            },
+            "offsets": offsets,
+        }
+
+    def run(self):
+        os.makedirs(self.directory, exist_ok=True)
+        previous = self.load_checkpoint()
+        if previous is None or previous["status"] == "complete":
+            self.state = self.new_run(previous)
+        else:
+            self.state = previous
+
+        files = {}
+        try:
+            for name in (CONTACTS, CONVERSATIONS, MESSAGES):
+                files[name] = open(self.path(name), "a+")
+                # drop whatever was written after the last checkpoint
+                files[name].truncate(self.state["offsets"][name])
+                files[name].seek(0, os.SEEK_END)
+            self.save_checkpoint(files)
+            if not self.state["contacts"]["done"]:
+                self.export_contacts(files)
+            if not self.state["conversations"]["done"]:
+                self.export_conversations(files)
+            self.state["status"] = "complete"
+            self.state["watermark"] = self.state["next_watermark"]
+            self.save_checkpoint(files)
+        finally:
+            for file in files.values():
+                file.close()
+        return self.state
+
+    def iter_pages(self, action_method, progress, **kwargs):
+        """Yield (page, items) starting after the last finished page."""
+        page = progress["page"]
+        while True:
+            page += 1
+            response = action_method(account_id=self.account_id, page=page, **kwargs)
+            items = get_page_items(response.body)
+            last = is_last_page(items, progress["page_size"])
+            progress["page_size"] = progress["page_size"] or len(items)
+            yield page, items
+            if last:
+                return
+
+    def export_contacts(self, files):
+        progress = self.state["contacts"]
+        for page, contacts in self.iter_pages(self.chatwoot.contacts.list, progress):
+            for contact in contacts:
+                files[CONTACTS].write(json.dumps(contact) + "\n")
+            progress["page"] = page
+            self.save_checkpoint(files)
+        progress["done"] = True
+        self.save_checkpoint(files)
+
+    def export_conversations(self, files):
+        progress = self.state["conversations"]
+        watermark = self.state["watermark"]
+        for page, conversations in self.iter_pages(
+            self.chatwoot.conversations.list, progress, **self.conversation_query
+        ):
+            ids = [conversation["id"] for conversation in conversations]
+            skip = progress["last_conversation_id"]
+            if skip is not None and skip in ids:
+                # resuming inside this page
+                conversations = conversations[ids.index(skip) + 1 :]
+            for conversation in conversations:
+                activity = get_activity(conversation)
+                if watermark is None or activity > watermark:
+                    files[CONVERSATIONS].write(json.dumps(conversation) + "\n")
+                    self.export_messages(files, conversation["id"], watermark)
+                self.state["next_watermark"] = max(
+                    self.state["next_watermark"] or 0, activity
+                )
+                progress["last_conversation_id"] = conversation["id"]
+                self.save_checkpoint(files)
+            progress["page"] = page
+            progress["last_conversation_id"] = None
+            self.save_checkpoint(files)
+        progress["done"] = True
+        self.save_checkpoint(files)
+
+    def export_messages(self, files, conversation_id, watermark):
+        if watermark is None:
+            # the whole history, oldest first
+            messages = self.chatwoot.messages.iter_messages(
+                account_id=self.account_id,
+                conversation_id=conversation_id,
+                direction="forward",
+            )
+        else:
+            # only walk back to the previous run
+            messages = self.chatwoot.messages.iter_messages(
+                account_id=self.account_id,
+                conversation_id=conversation_id,
+                stop_at=watermark,
+            )
+        for message in messages:
+            if watermark is None or (message.get("created_at") or 0) > watermark:
+                files[MESSAGES].write(json.dumps(message) + "\n")
@@ -0,0 +1,258 @@
+""" Durable outbox for outgoing messages, backed by SQLite."""
+
+import asyncio
+import json
+import sqlite3
+import time
+import uuid
+from collections import Counter
+
+from woot.simple_rest_client.exceptions import ClientConnectionError, ServerError
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+KEY_ATTRIBUTE = "woot_outbox_key"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    key TEXT PRIMARY KEY,
+    account_id INTEGER NOT NULL,
+    conversation_id INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    started_at REAL,
+    message_id INTEGER,
+    error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_status ON outbox (status, next_attempt_at);
+"""
+
+
+class Outbox:
+    """Journal messages to SQLite before sending them with `AsyncChatwoot`.
+
+    `put` stores the message under an idempotency key (generated if not
+    given, putting the same key twice stores it once) and returns the key.
+    `drain` sends everything pending, `concurrency` at a time, and marks
+    every entry `sent` once Chatwoot confirmed it. Failed sends are tried
+    again after `retry_delay` seconds, up to `max_attempts` times.
+
+    When it's unknown whether a send reached Chatwoot (the process died
+    mid-request, a timeout or a 5xx), the entry is checked against the
+    conversation's recent messages before it's sent again, so a restart
+    replays only entries that were not delivered. The key is sent along in
+    the message's `content_attributes` (as `woot_outbox_key`), a message
+    carrying it counts as delivered. An entry whose check keeps failing
+    (e.g. the conversation is gone) counts an attempt per check.
+
+        async with Outbox(chatwoot, "outbox.db") as outbox:
+            outbox.put(account_id=1, conversation_id=7, content="Hello")
+    """
+
+    def __init__(
+        self,
+        chatwoot,
+        path,
+        concurrency=16,
+        max_attempts=5,
+        retry_delay=1.0,
+        poll_interval=0.5,
+    ):
+        self.chatwoot = chatwoot
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self.db = sqlite3.connect(path, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        # whatever was mid-send when the process stopped has to be checked
+        self.db.execute(
+            "UPDATE outbox SET status = ? WHERE status = ?", (PENDING, SENDING)
+        )
+        self._task = None
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+
+    def put(self, account_id, conversation_id, content, key=None, **message):
+        key = key or uuid.uuid4().hex
+        self.db.execute(
+            "INSERT OR IGNORE INTO outbox "
+            "(key, account_id, conversation_id, message, status, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                account_id,
+                conversation_id,
+                json.dumps({"content": content, **message}),
+                PENDING,
+                time.time(),
+            ),
+        )
+        self._wakeup.set()
+        return key
+
+    def get(self, key):
+        row = self.db.execute("SELECT * FROM outbox WHERE key = ?", (key,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def counts(self):
+        rows = self.db.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status")
+        return Counter(dict(rows.fetchall()))
+
+    def next_batch(self):
+        """Claim the next entries ready to be sent."""
+        rows = self.db.execute(
+            "SELECT * FROM outbox WHERE status = ? AND next_attempt_at <= ? "
+            "ORDER BY created_at LIMIT ?",
+            (PENDING, time.time(), self.concurrency * 4),
+        ).fetchall()
+        for row in rows:
+            self.update(row["key"], status=SENDING)
+        return [dict(row) for row in rows]
+
+    def get_message(self, entry):
+        """The message to send, tagged with the entry's key."""
+        message = json.loads(entry["message"])
+        message["content_attributes"] = {
+            **(message.get("content_attributes") or {}),
+            KEY_ATTRIBUTE: entry["key"],
+        }
+        return message
+
+    def update(self, key, **values):
+        columns = ", ".join(f"{column} = ?" for column in values)
+        self.db.execute(
+            f"UPDATE outbox SET {columns} WHERE key = ?", (*values.values(), key)
+        )
+
+    async def find_delivered(self, entry):
+        """Look for the message among those created since the attempt started."""
+        # allow for the clocks of client and server not agreeing
+        messages = self.chatwoot.messages.aiter_messages(
+            stop_at=entry["started_at"] - 60,
+            account_id=entry["account_id"],
+            conversation_id=entry["conversation_id"],
+        )
+        async for message in messages:
+            attributes = message.get("content_attributes") or {}
+            if attributes.get(KEY_ATTRIBUTE) == entry["key"]:
+                return message.get("id")
+        return None
+
+    async def send(self, entry):
+        key = entry["key"]
+        if entry["started_at"] is not None:
+            try:
+                message_id = await self.find_delivered(entry)
+            except Exception as exc:
+                attempts = entry["attempts"] + 1
+                self.update(
+                    key,
+                    status=FAILED if attempts >= self.max_attempts else PENDING,
+                    attempts=attempts,
+                    next_attempt_at=time.time() + self.retry_delay * attempts,
+                    error=str(exc),
+                )
+                return
+            if message_id is not None:
+                self.update(key, status=SENT, message_id=message_id)
+                return
+        attempts = entry["attempts"] + 1
+        started_at = time.time()
+        self.update(key, status=SENDING, attempts=attempts, started_at=started_at)
+        try:
+            response = await self.chatwoot.messages.create(
+                account_id=entry["account_id"],
+                conversation_id=entry["conversation_id"],
+                **self.get_message(entry),
+            )
+        except asyncio.CancelledError:
+            self.update(key, status=PENDING)
+            raise
+        except (ClientConnectionError, ServerError, asyncio.TimeoutError) as exc:
+            # it may have been delivered, keep started_at so it's checked first
+            unconfirmed = True
+            error = exc
+        except Exception as exc:
+            unconfirmed = False
+            error = exc
+        else:
+            body = response.body if isinstance(response.body, dict) else {}
+            self.update(key, status=SENT, message_id=body.get("id"), error=None)
+            return
+        self.update(
+            key,
+            status=FAILED if attempts >= self.max_attempts else PENDING,
+            started_at=started_at if unconfirmed else entry["started_at"],
+            next_attempt_at=time.time() + self.retry_delay * attempts,
+            error=str(error),
+        )
+
+    async def drain(self):
+        """Send pending entries until none is ready, returns the counts."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def send(entry):
+            try:
+                async with semaphore:
+                    await self.send(entry)
+            except asyncio.CancelledError:
+                self.update(entry["key"], status=PENDING)
+                raise
+
+        while True:
+            batch = self.next_batch()
+            if not batch:
+                return self.counts()
+            await asyncio.gather(*[send(entry) for entry in batch])
+
+    async def run(self):
+        while True:
+            self._wakeup.clear()
+            await self.drain()
+            if self._stopping:
+                return
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        """Drain the outbox in a background task."""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self.run())
+        return self._task
+
+    async def stop(self, drain=True):
+        """Stop the background task, by default after sending what's ready."""
+        if self._task is None:
+            if drain:
+                await self.drain()
+            return
+        if drain:
+            self._stopping = True
+            self._wakeup.set()
+        else:
+            self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._stopping = False
+
+    def close(self):
+        self.db.close()
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, *args):
+        await self.stop(drain=exc_type is None)
+        self.close()
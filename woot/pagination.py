@@ -0,0 +1,246 @@
+""" Lazy iteration over page-based list actions."""
+
+import asyncio
+import contextvars
+import itertools
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+
+def is_paginated(action):
+    """Check if the action takes a `page` query parameter."""
+    return action.query is not None and "page" in action.query.__dataclass_fields__
+
+
+def get_page_items(body):
+    """Get the records of a page, wherever Chatwoot put them in the body."""
+    if isinstance(body, dict) and isinstance(body.get("data"), dict):
+        body = body["data"]  # conversations are wrapped in "data"
+    if isinstance(body, dict):
+        body = body.get("payload")
+    return body if isinstance(body, list) else []
+
+
+def is_last_page(items, page_size):
+    return not items or (page_size is not None and len(items) < page_size)
+
+
+def iter_pages(action_method, max_items=None, **kwargs):
+    """Yield items of every page, fetching the next page in the background.
+
+    Stops on the first empty page or on a page shorter than the first one.
+    """
+    page = kwargs.pop("page", None) or 1
+    page_size = None
+    count = 0
+    executor = ThreadPoolExecutor(max_workers=1)
+
+    def fetch(page):
+        # deadlines and other context must follow the request into the thread
+        context = contextvars.copy_context()
+        return executor.submit(context.run, action_method, page=page, **kwargs)
+
+    future = fetch(page)
+    try:
+        while True:
+            items = get_page_items(future.result().body)
+            last = is_last_page(items, page_size)
+            page_size = page_size or len(items)
+            if max_items is not None and count + len(items) >= max_items:
+                last = True
+            if not last:
+                page += 1
+                future = fetch(page)
+            for item in items:
+                yield item
+                count += 1
+                if max_items is not None and count >= max_items:
+                    return
+            if last:
+                return
+    finally:
+        future.cancel()
+        executor.shutdown(wait=False)
+
+
+async def aiter_pages(action_method, max_items=None, **kwargs):
+    """Async version of `iter_pages`, the next page is fetched in a task."""
+    page = kwargs.pop("page", None) or 1
+    page_size = None
+    count = 0
+    task = asyncio.ensure_future(action_method(page=page, **kwargs))
+    try:
+        while True:
+            items = get_page_items((await task).body)
+            last = is_last_page(items, page_size)
+            page_size = page_size or len(items)
+            if max_items is not None and count + len(items) >= max_items:
+                last = True
+            if not last:
+                page += 1
+                task = asyncio.ensure_future(action_method(page=page, **kwargs))
+            for item in items:
+                yield item
+                count += 1
+                if max_items is not None and count >= max_items:
+                    return
+            if last:
+                return
+    finally:
+        task.cancel()
+
+
+def get_message_window(body, direction, cursor):
+    """Messages of a window past `cursor`, in the order they are walked."""
+    messages = sorted(get_page_items(body), key=lambda message: message["id"])
+    if cursor is not None:
+        if direction == "backward":
+            messages = [m for m in messages if m["id"] < cursor]
+        else:
+            messages = [m for m in messages if m["id"] > cursor]
+    if direction == "backward":
+        messages.reverse()
+    return messages
+
+
+def get_cursor_params(direction, cursor):
+    if direction == "backward":
+        return {"before": cursor}
+    return {"after": cursor or 0}
+
+
+def is_past(message, direction, stop_at):
+    if stop_at is None:
+        return False
+    created_at = message.get("created_at") or 0
+    return created_at < stop_at if direction == "backward" else created_at > stop_at
+
+
+def iter_message_windows(
+    action_method, direction="backward", cursor=None, stop_at=None, **kwargs
+):
+    """Yield messages of a conversation window by window, by message id.
+
+    `backward` walks from the newest message (or from `cursor`) to older
+    ones, `forward` from the oldest (or `cursor`) to newer ones. The walk
+    stops at the first message created before (backward) or after
+    (forward) the `stop_at` timestamp. The next window is fetched in the
+    background while the current one is consumed.
+    """
+    executor = ThreadPoolExecutor(max_workers=1)
+
+    def fetch(cursor):
+        context = contextvars.copy_context()
+        params = get_cursor_params(direction, cursor)
+        return executor.submit(context.run, action_method, **params, **kwargs)
+
+    future = fetch(cursor)
+    try:
+        while True:
+            messages = get_message_window(future.result().body, direction, cursor)
+            if not messages:
+                return
+            cursor = messages[-1]["id"]
+            last = is_past(messages[-1], direction, stop_at)
+            if not last:
+                future = fetch(cursor)
+            for message in messages:
+                if is_past(message, direction, stop_at):
+                    return
+                yield message
+            if last:
+                return
+    finally:
+        future.cancel()
+        executor.shutdown(wait=False)
+
+
+async def aiter_message_windows(
+    action_method, direction="backward", cursor=None, stop_at=None, **kwargs
+):
+    """Async version of `iter_message_windows`."""
+
+    def fetch(cursor):
+        params = get_cursor_params(direction, cursor)
+        return asyncio.ensure_future(action_method(**params, **kwargs))
+
+    task = fetch(cursor)
+    try:
+        while True:
+            messages = get_message_window((await task).body, direction, cursor)
+            if not messages:
+                return
+            cursor = messages[-1]["id"]
+            last = is_past(messages[-1], direction, stop_at)
+            if not last:
+                task = fetch(cursor)
+            for message in messages:
+                if is_past(message, direction, stop_at):
+                    return
+                yield message
+            if last:
+                return
+    finally:
+        task.cancel()
+
+
+def get_total_count(body, assignee_type=None):
+    """Get the total number of records reported in the meta of the first page."""
+    if not isinstance(body, dict):
+        return None
+    if isinstance(body.get("data"), dict):
+        # conversations report a count per assignee type
+        meta = body["data"].get("meta") or {}
+        assignee_type = getattr(assignee_type, "value", assignee_type) or "all"
+        key = "mine_count" if assignee_type == "me" else f"{assignee_type}_count"
+        return meta.get(key)
+    return (body.get("meta") or {}).get("count")
+
+
+def unique_by_id(items):
+    """Drop repeated records, they show up when records shift between pages."""
+    seen = set()
+    for item in items:
+        item_id = item.get("id") if isinstance(item, dict) else None
+        if item_id is not None:
+            if item_id in seen:
+                continue
+            seen.add(item_id)
+        yield item
+
+
+async def afetch_all_pages(action_method, concurrency=8, **kwargs):
+    """Fetch the first page, then all remaining pages concurrently.
+
+    The number of pages comes from the total count in the first page's meta,
+    if the response has none it falls back to walking the pages one by one.
+    Returns the records of all pages deduplicated by `id`.
+    """
+    page = kwargs.pop("page", None) or 1
+    first = (await action_method(page=page, **kwargs)).body
+    items = get_page_items(first)
+    total = get_total_count(first, kwargs.get("assignee_type"))
+    if not items:
+        return []
+    if total is None:
+        rest = [
+            item async for item in aiter_pages(action_method, page=page + 1, **kwargs)
+        ]
+        return list(unique_by_id(items + rest))
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(page):
+        async with semaphore:
+            return get_page_items((await action_method(page=page, **kwargs)).body)
+
+    # the total counts all records, not those left after `page`
+    last_page = math.ceil(int(total) / len(items))
+    tasks = [asyncio.ensure_future(fetch(n)) for n in range(page + 1, last_page + 1)]
+    try:
+        pages = await asyncio.gather(*tasks)
+    finally:
+        # a failed page leaves the others running otherwise
+        for task in tasks:
+            task.cancel()
+    return list(unique_by_id(itertools.chain(items, *pages)))
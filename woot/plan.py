@@ -0,0 +1,95 @@
+""" Request plans compiled once per action."""
+
+import re
+from dataclasses import dataclass, fields, is_dataclass
+from types import MappingProxyType
+from typing import FrozenSet, Mapping, Tuple
+
+from woot.utils import contains_bytes
+
+PATH = "path"
+QUERY = "query"
+BODY = "body"
+
+
+@dataclass(frozen=True)
+class ActionPlan:
+    """How to turn the keyword arguments of an action into a request.
+
+    `url_segments` alternates literal parts of the URL template and path
+    parameter names, `routes` maps every accepted keyword to where its value
+    goes and `bytes_fields` lists the body fields that may carry files.
+    """
+
+    url_segments: Tuple[str, ...]
+    path_params: Tuple[str, ...]
+    routes: Mapping[str, Tuple[Tuple[str, str], ...]]
+    bytes_fields: FrozenSet[str]
+
+    def format_url(self, parts):
+        """Fill the path parameters, in template order, into the URL."""
+        if len(parts) != len(self.path_params):
+            raise IndexError(
+                "expected {} path parameters".format(len(self.path_params))
+            )
+        segments = self.url_segments
+        url = [segments[0]]
+        for index, part in enumerate(parts):
+            url.append(str(part))
+            url.append(segments[2 * index + 2])
+        return "".join(url)
+
+    def route(self, kwargs):
+        """Split keyword arguments into path, query, body and the rest."""
+        path, query, body, rest = {}, {}, {}, {}
+        targets = {PATH: path, QUERY: query, BODY: body}
+        for name, value in kwargs.items():
+            destinations = self.routes.get(name)
+            if destinations is None:
+                rest[name] = value
+                continue
+            for destination, key in destinations:
+                if destination == QUERY and value is None:
+                    continue  # not set, don't send an empty parameter
+                targets[destination][key] = value
+        parts = [path[name] for name in self.path_params if name in path]
+        return parts, query, body, rest
+
+    def has_bytes(self, body):
+        if not self.bytes_fields or not body:
+            return False
+        return any(contains_bytes(body.get(name)) for name in self.bytes_fields)
+
+
+def get_dataclass_fields(cls):
+    return fields(cls) if cls is not None and is_dataclass(cls) else ()
+
+
+def compile_action(action):
+    url_segments = tuple(re.split(r"\{(\w+)\}", action.url))
+    path_params = url_segments[1::2]
+    routes = {}
+
+    def add_route(name, destination, key):
+        routes[name] = routes.get(name, ()) + ((destination, key),)
+
+    for name in path_params:
+        add_route(name, PATH, name)
+    for field in get_dataclass_fields(action.query):
+        add_route(field.name, QUERY, field.name)
+    bytes_fields = set()
+    for field in get_dataclass_fields(action.schema_):
+        add_route(field.name, BODY, field.name)
+        alias = getattr(field.default, "alias", None)
+        if alias:
+            # aliased to keep clear of a path parameter with the same name
+            add_route(alias, BODY, field.name)
+        # files may come as bytes or as anything (`Any`)
+        if re.search(r"\b(bytes|Any)\b", str(field.type)):
+            bytes_fields.add(field.name)
+    return ActionPlan(
+        url_segments=url_segments,
+        path_params=path_params,
+        routes=MappingProxyType(routes),
+        bytes_fields=frozenset(bytes_fields),
+    )
@@ -3,25 +3,28 @@
 P.S. I'm proud of this one.
 """
 
-import re
 import pprint
-import httpx
-from httpx import URL
-from urllib.parse import unquote
 import functools
 from dataclasses import fields, is_dataclass
-from types import MethodType
 from woot.simple_rest_client.resource import (
     Resource,
-    BaseResource,
-    make_async_request,
-    Request,
+    AsyncResource,
 )
 from woot.simple_rest_client.exceptions import ActionURLMatchError
-from woot.utils import contains_bytes
 
 import woot.actions as a
-from woot.utils import update_signature, extract_path_params
+from woot.bulk import AsyncBulk, Bulk
+from woot.pagination import (
+    afetch_all_pages,
+    aiter_message_windows,
+    aiter_pages,
+    is_paginated,
+    iter_message_windows,
+    iter_pages,
+)
+from woot.plan import compile_action
+from woot.send_queue import SendQueue
+from woot.utils import update_signature
 
 
 class ActionMeta(type):
@@ -33,222 +36,90 @@ class ActionMeta(type):
             }
         else:
             attrs["default_actions"] = {v.name: v.default for v in fields(actions)}
+        attrs["action_plans"] = {
+            name: compile_action(action)
+            for name, action in attrs["default_actions"].items()
+        }
         new_class = super().__new__(cls, name, bases, attrs)
+        # methods, signatures and docs are built once per class, creating a
+        # resource only binds its configuration
+        for action_name in new_class.default_actions:
+            new_class.add_class_action(action_name)
         return new_class
 
 
-class WootResource(Resource):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+def make_action_method(action_name, action, plan, coroutine=False):
+    """Build the keyword-only method of an action, routed by its plan."""
+    if action.schema_ is not None:
+        action_schema = action.schema_.__dataclass_fields__
+    else:
+        action_schema = {}
+    if action.query is not None:
+        action_query = action.query.__dataclass_fields__
+    else:
+        action_query = {}
 
-        for action_name in self.actions.keys():
-            self.update_action(action_name)
+    def route_and_call(self, args, kwargs):
+        if len(args) > 0:
+            raise TypeError("Positional arguments are not allowed")
 
-    def update_action(self, action_name):
-        action_schema = self.actions[action_name].schema_
-        action_query = self.actions[action_name].query
-        url_params = extract_path_params(self.actions[action_name].url)
-        if action_schema is not None:
-            action_schema = action_schema.__dataclass_fields__
-        else:
-            action_schema = {}
-        if action_query is not None:
-            action_query = action_query.__dataclass_fields__
-        else:
-            action_query = {}
-
-        action_method = getattr(self, action_name)
-
-        @update_signature(action_schema, action_name, url_params, action_query)
-        def wrapped_action_method(self, *args, **kwargs):
-            if len(args) > 0:
-                raise TypeError("Positional arguments are not allowed")
-
-            schema_fields = action_schema.keys()
-            query_params = action_query.keys()
-            parts = {k: str(v) for k, v in kwargs.items() if k in url_params}
-            query = {k: v for k, v in kwargs.items() if k in query_params}
-            body = {k: v for k, v in kwargs.items() if k in schema_fields}
-            kwargs = {
-                k: v
-                for k, v in kwargs.items()
-                if k not in body and k not in parts and k not in query
-            }
-            self.actions[action_name].url = unquote(
-                str(URL(self.actions[action_name].url).copy_merge_params(params=query))
-            )
+        parts, query, body, kwargs = plan.route(kwargs)
+        return self.call_action(
+            action_name, *parts, body=body, params=query, headers=None, **kwargs
+        )
 
-            return action_method(
-                *parts.values(),
-                body=body,
-                params=None,
-                headers=None,
-                action_name=action_name,
-                **kwargs,
-            )
+    if coroutine:
 
-        setattr(self, action_name, MethodType(wrapped_action_method, self))
+        async def action_method(self, *args, **kwargs):
+            return await route_and_call(self, args, kwargs)
 
-    def get_action_full_url(self, action_name, *parts):
-        action = self.get_action(action_name)
-        try:
-            url = action["url"]
-            url = re.sub(r"{\w+}", "{}", url).format(*parts)
-        except IndexError:
-            raise ActionURLMatchError('No url match for "{}"'.format(action_name))
+    else:
 
-        if self.append_slash and not url.endswith("/"):
-            url += "/"
-        if not self.api_root_url.endswith("/"):
-            self.api_root_url += "/"
-        if url.startswith("/"):
-            url = url.replace("/", "", 1)
-        return self.api_root_url + url
+        def action_method(self, *args, **kwargs):
+            return route_and_call(self, args, kwargs)
 
-    def __repr__(self):
-        actions = self.actions
-        resource_name = self.__class__.__name__ + " actions:"
-        max_action_len = max([len(action) for action in self.actions.keys()])
-        max_method_len = max([len(action.method) for action in self.actions.values()])
-        max_url_len = max([len(action.url) for action in self.actions.values()])
-        header_width = max_action_len + max_method_len + max_url_len + 7
-        header = f"{resource_name}\n{'-' * (header_width)}\n"
-        actions_str = ""
+    action_method.__name__ = action_method.__qualname__ = action_name
+    return update_signature(
+        action_schema, action_name, list(plan.path_params), action_query
+    )(action_method)
 
-        for action_name, action in actions.items():
-            actions_str += (
-                f"{action_name}:".ljust(max_action_len + 2)
-                + f"{action.method}".ljust(max_method_len + 2)
-                + f"{action.url}".ljust(max_url_len + 2)
-            )
-            indent_const = max_action_len + max_method_len + 4
-            if action.query:
-                if len(action.query.__annotations__) <= 1:
-                    special_indent_q = indent_const + 2
-                else:
-                    special_indent_q = 0
-                actions_str += f"\n{' ' * (indent_const)}Query parameters: \n{' ' * (special_indent_q)}{pprint.pformat(action.query.__annotations__, indent=indent_const + 2, compact=True, width=header_width)}"
-            if action.schema_:
-                if len(action.schema_.__annotations__) <= 1:
-                    special_indent_p = indent_const + 2
-                else:
-                    special_indent_p = 0
-                actions_str += f"\n{' ' * (indent_const)}Body schema: \n{' ' * (special_indent_p)}{pprint.pformat(action.schema_.__annotations__, indent=indent_const + 2, compact=True, width=header_width)}"
-            actions_str += "\n\n"
 
-        return header + actions_str
+class WootResourceMixin:
+    """Behaviour shared by the sync and the async Woot resources."""
 
+    bulk_class = None
 
-# unfortunately I need to copy-paste the whole class
-# because I need to re-create httpx client as its closed after each request
-class AsyncResource(BaseResource):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.client = httpx.AsyncClient(verify=self.ssl_verify)
-        for action_name in self.actions.keys():
-            self.add_action(action_name)
-
-    def add_action(self, action_name):
-        async def action_method(
-            self,
-            *args,
-            body=None,
-            params=None,
-            headers=None,
-            action_name=action_name,
-            **kwargs,
-        ):
-            self.client = httpx.AsyncClient(verify=self.ssl_verify)
-            url = self.get_action_full_url(action_name, *args)
-            method = self.get_action_method(action_name)
-            request = Request(
-                url=url,
-                method=method,
-                params=params or {},
-                body=body,
-                headers=headers or {},
-                timeout=self.timeout,
-                kwargs=kwargs,
-            )
-
-            request.params.update(self.params)
-            request.headers.update(self.headers)
-            if contains_bytes(request.body):
-                add_headers = {"Content-Type": "multipart/form-data"}
-                request.headers.update(add_headers)
-            async with self.client as client:
-                return await make_async_request(client, request)
-
-        setattr(self, action_name, MethodType(action_method, self))
-
-
-class AsyncWootResource(AsyncResource):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-
-        for action_name in self.actions.keys():
-            self.update_action(action_name)
-
-    def update_action(self, action_name):
-        action_schema = self.actions[action_name].schema_
-        action_query = self.actions[action_name].query
-        url_params = extract_path_params(self.actions[action_name].url)
-        if action_schema is not None:
-            action_schema = action_schema.__dataclass_fields__
-        else:
-            action_schema = {}
-        if action_query is not None:
-            action_query = action_query.__dataclass_fields__
-        else:
-            action_query = {}
-
-        action_method = getattr(self, action_name)
-
-        @update_signature(action_schema, action_name, url_params, action_query)
-        def wrapped_action_method(self, *args, **kwargs):
-            if len(args) > 0:
-                raise TypeError("Positional arguments are not allowed")
-
-            schema_fields = action_schema.keys()
-            query_params = action_query.keys()
-            parts = {k: str(v) for k, v in kwargs.items() if k in url_params}
-            query = {k: v for k, v in kwargs.items() if k in query_params}
-            body = {k: v for k, v in kwargs.items() if k in schema_fields}
-            kwargs = {
-                k: v
-                for k, v in kwargs.items()
-                if k not in body and k not in parts and k not in query
-            }
-            self.actions[action_name].url = unquote(
-                str(URL(self.actions[action_name].url).copy_merge_params(params=query))
-            )
+    def is_multipart(self, action_name, body):
+        return self.action_plans[action_name].has_bytes(body)
 
-            return action_method(
-                *parts.values(),
-                body=body,
-                params=None,
-                headers=None,
-                action_name=action_name,
-                **kwargs,
-            )
+    def bulk(self, action_name, kwargs_iterable, concurrency=8, ordered=False):
+        """Run the action for every kwargs dict, `concurrency` calls at a time.
 
-        setattr(self, action_name, MethodType(wrapped_action_method, self))
+        Yields (kwargs, response_or_exception), see `woot.bulk.Bulk` and
+        `woot.bulk.AsyncBulk`.
+        """
+        return self.bulk_class(
+            getattr(self, action_name),
+            kwargs_iterable,
+            concurrency=concurrency,
+            ordered=ordered,
+        )
 
     def get_action_full_url(self, action_name, *parts):
-        action = self.get_action(action_name)
+        self.get_action(action_name)
         try:
-            url = action["url"]
-            url = re.sub(r"{\w+}", "{}", url).format(*parts)
+            url = self.action_plans[action_name].format_url(parts)
         except IndexError:
             raise ActionURLMatchError('No url match for "{}"'.format(action_name))
 
         if self.append_slash and not url.endswith("/"):
             url += "/"
-        if not self.api_root_url.endswith("/"):
-            self.api_root_url += "/"
+        api_root_url = self.api_root_url
+        if not api_root_url.endswith("/"):
+            api_root_url += "/"
         if url.startswith("/"):
             url = url.replace("/", "", 1)
-        return self.api_root_url + url
+        return api_root_url + url
 
     def __repr__(self):
         actions = self.actions
@@ -284,6 +155,65 @@ class AsyncWootResource(AsyncResource):
         return header + actions_str
 
 
+class WootResource(WootResourceMixin, Resource):
+    bulk_class = Bulk
+
+    @classmethod
+    def add_class_action(cls, action_name):
+        action = cls.default_actions[action_name]
+        action_method = make_action_method(
+            action_name, action, cls.action_plans[action_name]
+        )
+        setattr(cls, action_name, action_method)
+        if not is_paginated(action):
+            return
+
+        def iter_action_method(self, *, max_items=None, **kwargs):
+            return iter_pages(getattr(self, action_name), max_items=max_items, **kwargs)
+
+        iter_action_method.__doc__ = (
+            f"Iterate over items of all pages of {action_name}, up to max_items.\n\n"
+            f"{action_method.__doc__}"
+        )
+        setattr(cls, f"iter_{action_name}", iter_action_method)
+
+
+class AsyncWootResource(WootResourceMixin, AsyncResource):
+    bulk_class = AsyncBulk
+
+    @classmethod
+    def add_class_action(cls, action_name):
+        action = cls.default_actions[action_name]
+        action_method = make_action_method(
+            action_name, action, cls.action_plans[action_name], coroutine=True
+        )
+        setattr(cls, action_name, action_method)
+        if not is_paginated(action):
+            return
+
+        def aiter_action_method(self, *, max_items=None, **kwargs):
+            return aiter_pages(
+                getattr(self, action_name), max_items=max_items, **kwargs
+            )
+
+        aiter_action_method.__doc__ = (
+            f"Iterate over items of all pages of {action_name}, up to max_items.\n\n"
+            f"{action_method.__doc__}"
+        )
+        setattr(cls, f"aiter_{action_name}", aiter_action_method)
+
+        async def fetch_all_action_method(self, *, concurrency=8, **kwargs):
+            return await afetch_all_pages(
+                getattr(self, action_name), concurrency=concurrency, **kwargs
+            )
+
+        fetch_all_action_method.__doc__ = (
+            f"Fetch all pages of {action_name} concurrently, deduplicated by id.\n\n"
+            f"{action_method.__doc__}"
+        )
+        setattr(cls, f"fetch_all_{action_name}", fetch_all_action_method)
+
+
 class AccountResource(WootResource, metaclass=ActionMeta, actions=a.AccountActions):
     pass
 
@@ -363,7 +293,16 @@ class IntegrationsResource(
 
 
 class MessagesResource(WootResource, metaclass=ActionMeta, actions=a.MessagesActions):
-    pass
+    def iter_messages(
+        self, *, direction="backward", cursor=None, stop_at=None, **kwargs
+    ):
+        """Walk a conversation's messages by message id cursor.
+
+        See `woot.pagination.iter_message_windows`.
+        """
+        return iter_message_windows(
+            self.list, direction=direction, cursor=cursor, stop_at=stop_at, **kwargs
+        )
 
 
 class ProfileResource(WootResource, metaclass=ActionMeta, actions=a.ProfileActions):
@@ -502,7 +441,23 @@ class AsyncIntegrationsResource(
 class AsyncMessagesResource(
     AsyncWootResource, metaclass=ActionMeta, actions=a.MessagesActions
 ):
-    pass
+    def aiter_messages(
+        self, *, direction="backward", cursor=None, stop_at=None, **kwargs
+    ):
+        """Walk a conversation's messages by message id cursor.
+
+        See `woot.pagination.iter_message_windows`.
+        """
+        return aiter_message_windows(
+            self.list, direction=direction, cursor=cursor, stop_at=stop_at, **kwargs
+        )
+
+    def send_queue(self, max_pending=1000):
+        """Queue for `create` keeping the order of messages per conversation.
+
+        See `woot.send_queue.SendQueue`.
+        """
+        return SendQueue(self.create, key="conversation_id", max_pending=max_pending)
 
 
 class AsyncProfileResource(
@@ -795,6 +795,12 @@ class ApiV1AccountsAccountIdInboxMembersPatchRequest:
     user_ids: List[int]
 
 
+@dataclass
+class ApiV1AccountsAccountIdConversationsConversationIdMessagesGetParametersQuery:
+    before: Optional[int] = None
+    after: Optional[int] = None
+
+
 @dataclass
 class ApiV1AccountsAccountIdConversationsConversationIdMessagesGetResponse(
     GenericId, Message
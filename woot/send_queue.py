@@ -0,0 +1,100 @@
+""" Ordered sends per conversation, parallel across conversations."""
+
+import asyncio
+from collections import deque
+
+
+class SendQueue:
+    """Async queue calling `action_method` in FIFO order per `key` value.
+
+    Calls sharing a key (e.g. `conversation_id`) are sent one after another
+    in the order they were put, calls with different keys run in parallel.
+    `put` waits while `max_pending` calls are queued or in flight, so a fast
+    producer can't grow the queues without bound. A failed call doesn't stop
+    the ones queued after it, its error is raised from its future.
+
+        async with chatwoot.messages.send_queue() as queue:
+            first = await queue.put(account_id=1, conversation_id=7, content="a")
+            second = await queue.put(account_id=1, conversation_id=7, content="b")
+            response = await first
+    """
+
+    def __init__(self, action_method, key="conversation_id", max_pending=1000):
+        self.action_method = action_method
+        self.key = key
+        self._slots = asyncio.Semaphore(max_pending)
+        self._queues = {}
+        self._workers = {}
+
+    def depth(self, key):
+        """Number of calls queued or in flight for `key`."""
+        return len(self._queues.get(key, ()))
+
+    def depths(self):
+        return {key: len(queue) for key, queue in self._queues.items()}
+
+    @property
+    def pending(self):
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def put(self, **kwargs):
+        """Queue a call, returns a future resolved with its response."""
+        # a call without its key must not take a slot
+        key = kwargs[self.key]
+        await self._slots.acquire()
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(key, deque()).append((kwargs, future))
+        if key not in self._workers:
+            self._workers[key] = asyncio.ensure_future(self._drain(key))
+        return future
+
+    async def send(self, **kwargs):
+        """Queue a call and wait for its response."""
+        return await (await self.put(**kwargs))
+
+    async def _drain(self, key):
+        queue = self._queues[key]
+        try:
+            while queue:
+                kwargs, future = queue[0]
+                try:
+                    if not future.cancelled():
+                        response = await self.action_method(**kwargs)
+                        if not future.done():
+                            future.set_result(response)
+                except asyncio.CancelledError:
+                    future.cancel()
+                    raise
+                except Exception as exc:
+                    if not future.done():
+                        future.set_exception(exc)
+                finally:
+                    queue.popleft()
+                    self._slots.release()
+        finally:
+            for _, future in queue:
+                future.cancel()
+                self._slots.release()
+            del self._queues[key]
+            del self._workers[key]
+
+    async def join(self):
+        """Wait until every queued call is done."""
+        while self._workers:
+            await asyncio.wait(list(self._workers.values()))
+
+    async def cancel(self):
+        """Drop every queued call, calls in flight are cancelled."""
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, *args):
+        if exc_type is None:
+            await self.join()
+        else:
+            await self.cancel()
@@ -13,6 +13,18 @@ class API:
         append_slash=False,
         json_encode_body=False,
         ssl_verify=None,
+        client=None,
+        limits=None,
+        http2=False,
+        transport=None,
+        retry=None,
+        rate_limiter=None,
+        concurrency_limiter=None,
+        circuit_breakers=None,
+        hedging=None,
+        cache=None,
+        singleflight=None,
+        http_cache=None,
     ):
         self.api_root_url = api_root_url
         self.params = params or {}
@@ -21,6 +33,18 @@ class API:
         self.append_slash = append_slash
         self.json_encode_body = json_encode_body
         self.ssl_verify = True if ssl_verify is None else ssl_verify
+        self.client = client
+        self.limits = limits
+        self.http2 = http2
+        self.transport = transport
+        self.retry = retry
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self.circuit_breakers = circuit_breakers
+        self.hedging = hedging
+        self.cache = cache
+        self.singleflight = singleflight
+        self.http_cache = http_cache
         self._resources = {}
 
     def add_resource(
@@ -34,6 +58,18 @@ class API:
         append_slash=None,
         json_encode_body=None,
         ssl_verify=None,
+        client=None,
+        limits=None,
+        http2=None,
+        transport=None,
+        retry=None,
+        rate_limiter=None,
+        concurrency_limiter=None,
+        circuit_breakers=None,
+        hedging=None,
+        cache=None,
+        singleflight=None,
+        http_cache=None,
     ):
         resource_class = resource_class or Resource
         resource = resource_class(
@@ -51,6 +87,26 @@ class API:
             if json_encode_body is not None
             else self.json_encode_body,
             ssl_verify=ssl_verify if ssl_verify is not None else self.ssl_verify,
+            client=client if client is not None else self.client,
+            limits=limits if limits is not None else self.limits,
+            http2=http2 if http2 is not None else self.http2,
+            transport=transport if transport is not None else self.transport,
+            retry=retry if retry is not None else self.retry,
+            rate_limiter=rate_limiter
+            if rate_limiter is not None
+            else self.rate_limiter,
+            concurrency_limiter=concurrency_limiter
+            if concurrency_limiter is not None
+            else self.concurrency_limiter,
+            circuit_breakers=circuit_breakers
+            if circuit_breakers is not None
+            else self.circuit_breakers,
+            hedging=hedging if hedging is not None else self.hedging,
+            cache=cache if cache is not None else self.cache,
+            singleflight=singleflight
+            if singleflight is not None
+            else self.singleflight,
+            http_cache=http_cache if http_cache is not None else self.http_cache,
         )
         self._resources[resource_name] = resource
         resource_valid_name = self.correct_attribute_name(resource_name)
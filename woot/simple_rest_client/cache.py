@@ -0,0 +1,100 @@
+""" In-memory cache of GET responses."""
+import copy
+import hashlib
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import httpx
+
+
+def get_request_key(request):
+    """Identify a request by method, URL with params and access token."""
+    url = httpx.URL(request.url).copy_merge_params(request.params)
+    token = request.headers.get("api_access_token", "")
+    return request.method, str(url), hashlib.sha256(token.encode()).hexdigest()
+
+
+class ResponseCache:
+    """LRU cache of GET responses bounded by `max_bytes` of response bodies.
+
+    Responses are kept for the TTL of their action, `ttls` maps
+    `"resource.action"` (e.g. `"agents.list"`) to seconds and `ttl` applies
+    to every other GET; with the default `ttl=0` only the actions listed in
+    `ttls` are cached. Entries are keyed by method, URL, query params and
+    access token.
+
+    Any write (POST, PUT, PATCH, DELETE) made through a resource drops all
+    cached responses of that resource. `stats` counts hits, misses,
+    evictions and invalidations. Callers get a copy of the cached body, so
+    they may modify it.
+    """
+
+    def __init__(self, ttl=0, ttls=None, max_bytes=10 * 1024 * 1024):
+        self.ttl = ttl
+        self.ttls = ttls or {}
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.stats = Counter()
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._lock = threading.Lock()
+
+    def get_ttl(self, action_path):
+        return self.ttls.get(action_path, self.ttl)
+
+    def get(self, request):
+        key = get_request_key(request)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._delete(key)
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            response = entry[3]
+        return response._replace(body=copy.deepcopy(response.body))
+
+    def set(self, request, response, ttl, tag):
+        size = len(response.client_response.content)
+        if size > self.max_bytes:
+            return
+        key = get_request_key(request)
+        # the caller keeps the response it got, and may modify its body
+        response = response._replace(body=copy.deepcopy(response.body))
+        with self._lock:
+            if key in self._entries:
+                self._delete(key)
+            self._entries[key] = (time.monotonic() + ttl, size, tag, response)
+            self._tags.setdefault(tag, set()).add(key)
+            self.size += size
+            while self.size > self.max_bytes:
+                self._delete(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def _delete(self, key):
+        _, size, tag, _ = self._entries.pop(key)
+        self.size -= size
+        self._tags[tag].discard(key)
+
+    def invalidate(self, tag):
+        """Drop every cached response of the resource `tag`."""
+        with self._lock:
+            keys = self._tags.pop(tag, set())
+            for key in keys:
+                _, size, _, _ = self._entries.pop(key)
+                self.size -= size
+            if keys:
+                self.stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,162 @@
+""" Circuit breakers to fail fast while an endpoint is down."""
+import threading
+import time
+from collections import deque
+
+from woot.simple_rest_client.exceptions import CircuitOpenError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Circuit breaker for a single endpoint.
+
+    Opens after `failure_threshold` consecutive failures, or when at least
+    `failure_rate_threshold` of the last `window_size` calls failed. While
+    open every call raises `CircuitOpenError` right away. After
+    `reset_timeout` seconds it lets `half_open_max_calls` probes through,
+    a successful probe closes it again and a failed one re-opens it.
+
+    Listeners are called as `listener(breaker, old_state, new_state)` on
+    every transition.
+    """
+
+    def __init__(
+        self,
+        name,
+        failure_threshold=5,
+        failure_rate_threshold=0.5,
+        window_size=20,
+        reset_timeout=30.0,
+        half_open_max_calls=1,
+        listeners=None,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.failure_rate_threshold = failure_rate_threshold
+        self.window_size = window_size
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.listeners = list(listeners or [])
+        self.consecutive_failures = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_started_at = 0.0
+        self._outcomes = deque(maxlen=window_size)
+        # listeners run under the lock and may read the state back
+        self._lock = threading.RLock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    @property
+    def failure_rate(self):
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return self._outcomes.count(False) / len(self._outcomes)
+
+    def _current_state(self, now):
+        if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def _transition(self, new_state):
+        old_state, self._state = self._state, new_state
+        if new_state == OPEN:
+            self._opened_at = time.monotonic()
+        if new_state == CLOSED:
+            self._outcomes.clear()
+            self.consecutive_failures = 0
+        self._probes = 0
+        for listener in self.listeners:
+            listener(self, old_state, new_state)
+
+    def before_request(self):
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and (
+                self._probes < self.half_open_max_calls
+                # a probe that never reported back must not block forever
+                or now - self._probe_started_at >= self.reset_timeout
+            ):
+                self._probes += 1
+                self._probe_started_at = now
+                return
+            raise CircuitOpenError(
+                f"operation=circuit_open, endpoint={self.name}, "
+                f"retry_in={max(self.reset_timeout - (now - self._opened_at), 0):.1f}s"
+            )
+
+    def release(self):
+        """End a call without an outcome, e.g. when its caller ran out of time."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self._outcomes.append(True)
+            if self._state == HALF_OPEN:
+                self._transition(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._outcomes.append(False)
+            if self._state == HALF_OPEN:
+                self._transition(OPEN)
+            elif self._state == CLOSED and (
+                self.consecutive_failures >= self.failure_threshold
+                or (
+                    len(self._outcomes) == self.window_size
+                    and self._outcomes.count(False) / self.window_size
+                    >= self.failure_rate_threshold
+                )
+            ):
+                self._transition(OPEN)
+
+    def __repr__(self):
+        return f"CircuitBreaker(name={self.name!r}, state={self.state!r})"
+
+
+class CircuitBreakerRegistry:
+    """Circuit breakers keyed by endpoint, e.g. `GET api/v1/accounts/{account_id}`.
+
+    Breakers are created on first use with the keyword arguments given here,
+    listeners added with `add_listener` apply to all of them.
+    """
+
+    def __init__(self, **breaker_kwargs):
+        self.listeners = list(breaker_kwargs.pop("listeners", None) or [])
+        self.breaker_kwargs = breaker_kwargs
+        self.breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            if name not in self.breakers:
+                self.breakers[name] = CircuitBreaker(
+                    name, listeners=self.listeners, **self.breaker_kwargs
+                )
+            return self.breakers[name]
+
+    def add_listener(self, listener):
+        with self._lock:
+            self.listeners.append(listener)
+            for breaker in self.breakers.values():
+                breaker.listeners.append(listener)
+
+    def states(self):
+        with self._lock:
+            breakers = dict(self.breakers)
+        return {name: breaker.state for name, breaker in breakers.items()}
@@ -0,0 +1,95 @@
+""" Adaptive concurrency limit for async requests."""
+import asyncio
+import time
+from collections import deque
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on the number of in-flight async requests.
+
+    The limit grows by one per window of healthy responses (latency within
+    `latency_tolerance` times the best of the last `latency_window`
+    latencies, so one unusually fast response doesn't set the bar for good)
+    and is multiplied by `backoff_ratio` on timeouts, connection errors,
+    429s and 5xx. Only requests started after the last decrease can shrink
+    the limit again, so a burst of failures from one window counts once.
+
+    `limit`, `in_flight` and `queue_depth` show the current state.
+    """
+
+    def __init__(
+        self,
+        initial_limit=10,
+        min_limit=1,
+        max_limit=200,
+        backoff_ratio=0.5,
+        latency_tolerance=2.0,
+        latency_window=100,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._waiters = deque()
+        self._latencies = deque(maxlen=latency_window)
+        self._last_decrease = 0.0
+
+    @property
+    def limit(self):
+        return int(self._limit)
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    @property
+    def queue_depth(self):
+        return len(self._waiters)
+
+    async def acquire(self):
+        """Wait for a free slot, returns the start time to pass to `release`."""
+        if not self._waiters and self._in_flight < self.limit:
+            self._in_flight += 1
+            return time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over right before cancellation
+                self._in_flight -= 1
+                self._wake_up()
+            else:
+                self._waiters.remove(waiter)
+            raise
+        return time.monotonic()
+
+    def release(self, started, overloaded=None):
+        """Free a slot, `overloaded=None` means the outcome says nothing."""
+        self._in_flight -= 1
+        if overloaded:
+            if started >= self._last_decrease:
+                self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+                self._last_decrease = time.monotonic()
+        elif overloaded is not None:
+            latency = time.monotonic() - started
+            self._latencies.append(latency)
+            if latency <= min(self._latencies) * self.latency_tolerance:
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+        self._wake_up()
+
+    def _wake_up(self):
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    def __repr__(self):
+        return (
+            f"AdaptiveConcurrencyLimiter(limit={self.limit}, "
+            f"in_flight={self.in_flight}, queue_depth={self.queue_depth})"
+        )
@@ -0,0 +1,78 @@
+""" Deadlines shared by all requests made within a block of code."""
+import contextvars
+import time
+
+from woot.simple_rest_client.exceptions import DeadlineExceeded
+
+_current_deadline = contextvars.ContextVar("woot_deadline", default=None)
+
+
+def get_deadline():
+    return _current_deadline.get()
+
+
+def run_without_deadline(function, *args):
+    """Call `function` in a copy of the current context without a deadline."""
+    context = contextvars.copy_context()
+    context.run(_current_deadline.set, None)
+    return context.run(function, *args)
+
+
+class Deadline:
+    """Time budget for every request made inside the block.
+
+    Each request's timeout is cut down to what is left of the budget and
+    async requests still in flight when it runs out are cancelled.
+    `DeadlineExceeded` names the request that ran out of time. Nested
+    deadlines can only make the budget shorter.
+
+        with Deadline(2.0):
+            conversation = chatwoot.conversations.get(...)
+            messages = chatwoot.messages.list(...)
+
+    It works both as `with` and `async with` block.
+    """
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.expires_at = None
+        self._tokens = []
+
+    def remaining(self):
+        return self.expires_at - time.monotonic()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def bound(self, request):
+        """Return `request` with its timeout cut to the remaining budget."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise self.exceeded(request)
+        timeout = request.timeout
+        if not isinstance(timeout, (int, float)) or timeout > remaining:
+            timeout = remaining
+        return request._replace(timeout=timeout)
+
+    def exceeded(self, request):
+        return DeadlineExceeded(
+            f"operation=deadline_exceeded, method={request.method}, "
+            f"url={request.url}, deadline={self.timeout}s"
+        )
+
+    def __enter__(self):
+        self.expires_at = time.monotonic() + self.timeout
+        parent = _current_deadline.get()
+        if parent is not None and parent.expires_at < self.expires_at:
+            self.expires_at = parent.expires_at
+        self._tokens.append(_current_deadline.set(self))
+        return self
+
+    def __exit__(self, *args):
+        _current_deadline.reset(self._tokens.pop())
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, *args):
+        self.__exit__(*args)
@@ -1,13 +1,17 @@
+import asyncio
 import logging
-from functools import wraps
+import time
+from functools import partial, wraps
 
 import httpx
 import status
 
+from woot.simple_rest_client.deadline import get_deadline
 from woot.simple_rest_client.exceptions import (
     AuthError,
     ClientConnectionError,
     ClientError,
+    DeadlineExceeded,
     NotFoundError,
     ServerError,
 )
@@ -31,32 +35,234 @@ def validate_response(response):
         raise ServerError("operation=server_error," + error_suffix, response)
 
 
+def is_overload_status(status_code):
+    return status_code == status.HTTP_429_TOO_MANY_REQUESTS or status.is_server_error(
+        code=status_code
+    )
+
+
+async def send_with_concurrency_limit(f, client, request, concurrency):
+    if concurrency is None:
+        return await f(client, request)
+    started = await concurrency.acquire()
+    overloaded = None
+    try:
+        response = await f(client, request)
+        overloaded = is_overload_status(response.status_code)
+        return response
+    except client_connection_exceptions:
+        overloaded = True
+        raise
+    finally:
+        concurrency.release(started, overloaded)
+
+
+def get_retry_delay(deadline, request, delay):
+    # don't sleep past the deadline just to fail afterwards
+    if deadline is not None and delay >= deadline.remaining():
+        raise deadline.exceeded(request)
+    return delay
+
+
+def get_throttle_delay(rate_limiter, deadline, request):
+    """How long the rate limiter holds `request` back, within the deadline."""
+    if rate_limiter is None:
+        return 0
+    delay = rate_limiter.reserve(request)
+    if delay <= 0:
+        return 0
+    try:
+        return get_retry_delay(deadline, request, delay)
+    except DeadlineExceeded:
+        rate_limiter.refund(request)
+        raise
+
+
+def release_breaker(breaker):
+    # running out of the caller's budget says nothing about the endpoint
+    if breaker is not None:
+        breaker.release()
+
+
 def handle_request_error(f):
     @wraps(f)
-    def wrapper(*args, **kwargs):
-        try:
-            response = f(*args, **kwargs)
-        except client_connection_exceptions as exc:
-            logger.exception(exc)
-            raise ClientConnectionError(exc)
+    def wrapper(client, request, retry=None, rate_limiter=None, breaker=None):
+        deadline = get_deadline()
+        attempt = throttled = 1
+        while True:
+            if breaker is not None:
+                breaker.before_request()
+            try:
+                delay = get_throttle_delay(rate_limiter, deadline, request)
+                if delay:
+                    time.sleep(delay)
+                if deadline is not None:
+                    request = deadline.bound(request)
+            except DeadlineExceeded:
+                release_breaker(breaker)
+                raise
+            try:
+                response = f(client, request)
+            except client_connection_exceptions as exc:
+                if deadline is not None and deadline.expired():
+                    release_breaker(breaker)
+                    raise deadline.exceeded(request) from exc
+                if breaker is not None:
+                    breaker.record_failure()
+                if retry is not None and retry.should_retry(request, attempt):
+                    logger.warning(
+                        "operation=retry, attempt=%d, method=%s, url=%s, exc=%r",
+                        attempt,
+                        request.method,
+                        request.url,
+                        exc,
+                    )
+                    delay = retry.get_delay(attempt)
+                    time.sleep(get_retry_delay(deadline, request, delay))
+                    attempt += 1
+                    continue
+                logger.exception(exc)
+                raise ClientConnectionError(exc)
 
-        validate_response(response)
+            if breaker is not None:
+                if status.is_server_error(code=response.status_code):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
 
-        return response
+            if (
+                rate_limiter is not None
+                and rate_limiter.update(request, response)
+                and throttled <= rate_limiter.max_throttle_retries
+            ):
+                logger.warning(
+                    "operation=throttled, attempt=%d, method=%s, url=%s",
+                    throttled,
+                    request.method,
+                    request.url,
+                )
+                throttled += 1
+                continue
+
+            if retry is not None and retry.should_retry(request, attempt, response):
+                logger.warning(
+                    "operation=retry, attempt=%d, method=%s, url=%s, status_code=%d",
+                    attempt,
+                    request.method,
+                    request.url,
+                    response.status_code,
+                )
+                delay = retry.get_delay(attempt, response)
+                time.sleep(get_retry_delay(deadline, request, delay))
+                attempt += 1
+                continue
+
+            validate_response(response)
+
+            return response
 
     return wrapper
 
 
 def handle_async_request_error(f):
-    async def wrapper(*args, **kwargs):
-        try:
-            response = await f(*args, **kwargs)
-        except client_connection_exceptions as exc:
-            logger.exception(exc)
-            raise ClientConnectionError(exc)
+    @wraps(f)
+    async def wrapper(
+        client,
+        request,
+        retry=None,
+        rate_limiter=None,
+        concurrency=None,
+        breaker=None,
+        hedging=None,
+    ):
+        deadline = get_deadline()
+        attempt = throttled = 1
+        while True:
+            if breaker is not None:
+                breaker.before_request()
+            try:
+                delay = get_throttle_delay(rate_limiter, deadline, request)
+                if delay:
+                    await asyncio.sleep(delay)
+                if deadline is not None:
+                    request = deadline.bound(request)
+            except DeadlineExceeded:
+                release_breaker(breaker)
+                raise
+            try:
+                send = partial(
+                    send_with_concurrency_limit, f, client, request, concurrency
+                )
+                if hedging is not None and request.method.upper() == "GET":
+                    sending = hedging.run(send)
+                else:
+                    sending = send()
+                if deadline is not None:
+                    # cancels the request if the budget runs out mid-flight
+                    response = await asyncio.wait_for(sending, deadline.remaining())
+                else:
+                    response = await sending
+            except asyncio.TimeoutError:
+                if deadline is None:
+                    raise
+                release_breaker(breaker)
+                raise deadline.exceeded(request)
+            except client_connection_exceptions as exc:
+                if deadline is not None and deadline.expired():
+                    release_breaker(breaker)
+                    raise deadline.exceeded(request) from exc
+                if breaker is not None:
+                    breaker.record_failure()
+                if retry is not None and retry.should_retry(request, attempt):
+                    logger.warning(
+                        "operation=retry, attempt=%d, method=%s, url=%s, exc=%r",
+                        attempt,
+                        request.method,
+                        request.url,
+                        exc,
+                    )
+                    delay = retry.get_delay(attempt)
+                    await asyncio.sleep(get_retry_delay(deadline, request, delay))
+                    attempt += 1
+                    continue
+                logger.exception(exc)
+                raise ClientConnectionError(exc)
 
-        validate_response(response)
+            if breaker is not None:
+                if status.is_server_error(code=response.status_code):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
 
-        return response
+            if (
+                rate_limiter is not None
+                and rate_limiter.update(request, response)
+                and throttled <= rate_limiter.max_throttle_retries
+            ):
+                logger.warning(
+                    "operation=throttled, attempt=%d, method=%s, url=%s",
+                    throttled,
+                    request.method,
+                    request.url,
+                )
+                throttled += 1
+                continue
+
+            if retry is not None and retry.should_retry(request, attempt, response):
+                logger.warning(
+                    "operation=retry, attempt=%d, method=%s, url=%s, status_code=%d",
+                    attempt,
+                    request.method,
+                    request.url,
+                    response.status_code,
+                )
+                delay = retry.get_delay(attempt, response)
+                await asyncio.sleep(get_retry_delay(deadline, request, delay))
+                attempt += 1
+                continue
+
+            validate_response(response)
+
+            return response
 
     return wrapper
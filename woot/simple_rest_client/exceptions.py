@@ -10,6 +10,14 @@ class ClientConnectionError(Exception):
     pass
 
 
+class CircuitOpenError(ClientConnectionError):
+    pass
+
+
+class DeadlineExceeded(ClientConnectionError):
+    pass
+
+
 class ErrorWithResponse(Exception):
     def __init__(self, message, response):
         self.message = message
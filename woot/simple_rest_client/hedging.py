@@ -0,0 +1,78 @@
+""" Request hedging to cut tail latency of idempotent requests."""
+import asyncio
+import time
+from collections import Counter, deque
+
+
+class HedgingPolicy:
+    """Send a second copy of a slow GET and use whichever answers first.
+
+    The hedge is fired when the first attempt has not answered within the
+    `percentile` of recently observed latencies (never sooner than
+    `min_delay`), the slower attempt is cancelled. At most `budget` of all
+    requests are hedged, so the extra load is capped.
+
+    `stats` counts `requests`, `hedged` and `hedge_wins`.
+    """
+
+    def __init__(
+        self,
+        percentile=0.95,
+        min_delay=0.05,
+        initial_delay=1.0,
+        budget=0.1,
+        window_size=1000,
+        min_samples=20,
+    ):
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.initial_delay = initial_delay
+        self.budget = budget
+        self.min_samples = min_samples
+        self.stats = Counter()
+        self._latencies = deque(maxlen=window_size)
+
+    def get_delay(self):
+        if len(self._latencies) < self.min_samples:
+            return max(self.initial_delay, self.min_delay)
+        latencies = sorted(self._latencies)
+        index = min(int(len(latencies) * self.percentile), len(latencies) - 1)
+        return max(latencies[index], self.min_delay)
+
+    def can_hedge(self):
+        return self.stats["hedged"] < self.stats["requests"] * self.budget
+
+    async def run(self, send):
+        """Run `send()` and hedge it if it is slow, returns the first result."""
+        self.stats["requests"] += 1
+        attempts = [asyncio.ensure_future(send())]
+        started = [time.monotonic()]
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=self.get_delay())
+            if not done and self.can_hedge():
+                self.stats["hedged"] += 1
+                attempts.append(asyncio.ensure_future(send()))
+                started.append(time.monotonic())
+
+            pending = set(attempts)
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                succeeded = [a for a in done if a.exception() is None]
+                # prefer the first attempt if both finished together
+                winner = min(succeeded or done, key=attempts.index)
+                if succeeded or not pending:
+                    break
+        finally:
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+                elif not attempt.cancelled():
+                    attempt.exception()  # the loser's error is not interesting
+
+        # latency of the answer that was used, measured from its own start
+        self._latencies.append(time.monotonic() - started[attempts.index(winner)])
+        if winner is not attempts[0]:
+            self.stats["hedge_wins"] += 1
+        return winner.result()
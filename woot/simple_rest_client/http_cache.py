@@ -0,0 +1,186 @@
+""" HTTP cache revalidating GET responses with ETag and Last-Modified."""
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import httpx
+
+from woot.simple_rest_client.cache import get_request_key
+from woot.simple_rest_client.request import build_response
+
+
+class MemoryCacheStore:
+    """Keep cached responses in memory, up to `max_entries` (LRU)."""
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCacheStore:
+    """Keep cached responses in a SQLite file, so they survive restarts.
+
+    Holds up to `max_entries` responses, the least recently used are
+    dropped first.
+    """
+
+    def __init__(self, path, max_entries=1000):
+        self.max_entries = max_entries
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS http_cache "
+            "(key TEXT PRIMARY KEY, entry TEXT NOT NULL, content BLOB NOT NULL)"
+        )
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(http_cache)")]
+        if "used_at" not in columns:
+            # files written before entries were evicted
+            self.db.execute(
+                "ALTER TABLE http_cache ADD COLUMN used_at REAL NOT NULL DEFAULT 0"
+            )
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS http_cache_used_at ON http_cache (used_at)"
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            row = self.db.execute(
+                "SELECT entry, content FROM http_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self.db.execute(
+                    "UPDATE http_cache SET used_at = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+        if row is None:
+            return None
+        return {**json.loads(row[0]), "content": row[1]}
+
+    def set(self, key, entry):
+        content = entry["content"]
+        entry = {k: v for k, v in entry.items() if k != "content"}
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO http_cache (key, entry, content, used_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(entry), content, time.time()),
+            )
+            self.db.execute(
+                "DELETE FROM http_cache WHERE key IN (SELECT key FROM http_cache "
+                "ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM http_cache").fetchone()[0]
+
+    def delete(self, key):
+        with self._lock:
+            self.db.execute("DELETE FROM http_cache WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self.db.execute("DELETE FROM http_cache")
+
+    def close(self):
+        self.db.close()
+
+
+class HTTPCache:
+    """Revalidate GET responses instead of downloading them again.
+
+    Responses carrying an `ETag` or `Last-Modified` header are stored with
+    their validators. The next identical GET is sent with `If-None-Match` /
+    `If-Modified-Since` and a `304 Not Modified` is answered with the
+    stored response. The store is in memory by default, pass
+    `SQLiteCacheStore(path)` to keep it across restarts:
+
+        chatwoot = Chatwoot(..., http_cache=HTTPCache(SQLiteCacheStore("woot.db")))
+
+    `stats` counts revalidated (304) responses, misses and stored responses.
+    """
+
+    def __init__(self, store=None):
+        self.store = store if store is not None else MemoryCacheStore()
+        self.stats = Counter()
+
+    def get_key(self, request):
+        return " ".join(get_request_key(request))
+
+    def prepare(self, request):
+        """Add validators of a stored response, returns the entry or None."""
+        entry = self.store.get(self.get_key(request))
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        if entry.get("etag"):
+            request.headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            request.headers["If-Modified-Since"] = entry["last_modified"]
+        return entry
+
+    def update(self, request, response, entry):
+        """Store a fresh response or answer a 304 from `entry`."""
+        if response.status_code == 304 and entry is not None:
+            self.stats["revalidated"] += 1
+            client_response = httpx.Response(
+                status_code=entry["status_code"],
+                headers=entry["headers"],
+                content=entry["content"],
+                request=response.client_response.request,
+            )
+            return build_response(response.method, client_response)
+        headers = response.headers
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if response.status_code == 200 and (etag or last_modified):
+            self.stats["stored"] += 1
+            self.store.set(
+                self.get_key(request),
+                {
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "status_code": response.status_code,
+                    "headers": [
+                        (name, value)
+                        for name, value in headers.multi_items()
+                        # the stored content is already decoded
+                        if name.lower() not in ("content-encoding", "content-length")
+                    ],
+                    "content": response.client_response.content,
+                    "stored_at": time.time(),
+                },
+            )
+        elif entry is not None and response.status_code == 200:
+            self.store.delete(self.get_key(request))
+        return response
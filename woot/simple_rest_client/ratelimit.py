@@ -0,0 +1,159 @@
+""" Client-side rate limiting for requests."""
+import asyncio
+import hashlib
+import threading
+import time
+
+import httpx
+
+from woot.simple_rest_client.retry import parse_retry_after
+
+
+def _parse_reset(value):
+    """Parse a rate-limit reset header, either seconds or a unix timestamp."""
+    try:
+        reset = float(value)
+    except (TypeError, ValueError):
+        return None
+    if reset > 10**9:
+        reset -= time.time()
+    return max(reset, 0.0)
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second, holding up to `burst`.
+
+    `reserve` never blocks, it takes a token (possibly going into debt) and
+    returns how long the caller has to wait before sending, so the same
+    bucket works for threads and for asyncio tasks.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        # no tokens come in while the bucket is paused
+        elapsed = now - max(self._updated, self.blocked_until)
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+        self._updated = now
+
+    def reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            # the debt is paid off at `rate` once the pause is over
+            wait = max(-self.tokens, 0.0) / self.rate
+            return max(self.blocked_until - now, 0.0) + wait
+
+    def refund(self):
+        """Give back a reserved token that was not used."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.burst, self.tokens + 1)
+
+    def block(self, seconds):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.blocked_until = max(self.blocked_until, now + seconds)
+            # don't let the whole burst fire right after the pause
+            self.tokens = min(self.tokens, 0.0)
+
+    def budget(self):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "tokens": self.tokens,
+                "rate": self.rate,
+                "burst": self.burst,
+                "blocked_for": max(self.blocked_until - now, 0.0),
+            }
+
+
+class RateLimiter:
+    """Rate limiter keyed by base URL and access token.
+
+    Every request takes a token from the bucket of its Chatwoot instance and
+    access token, so bursts are smoothed to `rate` requests per second. On
+    429 the bucket is paused for `Retry-After` (or `backoff` seconds) and the
+    request is sent again up to `max_throttle_retries` times; exhausted
+    rate-limit headers (`X-RateLimit-Remaining: 0`) pause it until the reset.
+
+    One limiter may be shared by several clients, `budget()` reports the
+    state of every bucket.
+    """
+
+    def __init__(self, rate=10.0, burst=None, backoff=1.0, max_throttle_retries=3):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(int(rate), 1)
+        self.backoff = backoff
+        self.max_throttle_retries = max_throttle_retries
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def get_key(self, request):
+        url = httpx.URL(request.url)
+        base_url = f"{url.scheme}://{url.netloc.decode('ascii')}"
+        token = request.headers.get("api_access_token", "")
+        return base_url, hashlib.sha256(token.encode()).hexdigest()[:12]
+
+    def get_bucket(self, request):
+        key = self.get_key(request)
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(self.rate, self.burst)
+            return self._buckets[key]
+
+    def reserve(self, request):
+        """Take a token, returns how long to wait before sending `request`."""
+        return self.get_bucket(request).reserve()
+
+    def refund(self, request):
+        self.get_bucket(request).refund()
+
+    def acquire(self, request):
+        wait = self.reserve(request)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def async_acquire(self, request):
+        wait = self.reserve(request)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def update(self, request, response):
+        """Feed a response back, returns True if the request was throttled."""
+        headers = response.headers
+        if response.status_code == 429:
+            retry_after = parse_retry_after(headers.get("Retry-After"))
+            if retry_after is None:
+                retry_after = _parse_reset(
+                    headers.get("X-RateLimit-Reset", headers.get("RateLimit-Reset"))
+                )
+            self.get_bucket(request).block(
+                retry_after if retry_after is not None else self.backoff
+            )
+            return True
+        remaining = headers.get(
+            "X-RateLimit-Remaining", headers.get("RateLimit-Remaining")
+        )
+        if remaining is not None and remaining.strip() == "0":
+            reset = _parse_reset(
+                headers.get("X-RateLimit-Reset", headers.get("RateLimit-Reset"))
+            )
+            if reset:
+                self.get_bucket(request).block(reset)
+        return False
+
+    def budget(self):
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {key: bucket.budget() for key, bucket in buckets.items()}
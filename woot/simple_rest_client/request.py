@@ -9,48 +9,56 @@ from woot.simple_rest_client.models import Response
 logger = logging.getLogger(__name__)
 
 
+def parse_body(client_response):
+    content_type = client_response.headers.get("Content-Type", "")
+    if "text" in content_type:
+        return client_response.text
+    if "json" in content_type:
+        body = client_response.text
+        if body:
+            body = client_response.json()
+        return body
+    return client_response.content
+
+
+def build_response(method, client_response):
+    return Response(
+        url=str(client_response.url),
+        method=method,
+        body=parse_body(client_response),
+        headers=client_response.headers,
+        status_code=client_response.status_code,
+        client_response=client_response,
+    )
+
+
 @handle_request_error
 def make_request(client, request):
     logger.debug("operation=request_started, request=%r", request)
     method = request.method
     client_method = getattr(client, method.lower())
+    # work on copies, the same request may be sent again on retry
+    headers = dict(request.headers)
     client_options = {
         "params": request.params,
-        "headers": request.headers,
+        "headers": headers,
         "timeout": request.timeout,
         **request.kwargs,
     }
     if method.lower() in ("post", "put", "patch"):
-        if request.headers.get("Content-Type") == "application/json":
+        if headers.get("Content-Type") == "application/json":
             client_options["json"] = request.body
-        elif request.headers.get("Content-Type") == "multipart/form-data":
-            files = request.body.pop("files")
-            client_options["files"] = files
-            if request.body:
-                client_options["data"] = request.body
-            request.headers.pop("Content-Type")
+        elif headers.get("Content-Type") == "multipart/form-data":
+            body = dict(request.body)
+            client_options["files"] = body.pop("files")
+            if body:
+                client_options["data"] = body
+            headers.pop("Content-Type")
         else:
             client_options["data"] = request.body
 
     client_response = client_method(request.url, **client_options)
-    content_type = client_response.headers.get("Content-Type", "")
-    if "text" in content_type:
-        body = client_response.text
-    elif "json" in content_type:
-        body = client_response.text
-        if body:
-            body = client_response.json()
-    else:
-        body = client_response.content
-
-    response = Response(
-        url=str(client_response.url),
-        method=method,
-        body=body,
-        headers=client_response.headers,
-        status_code=client_response.status_code,
-        client_response=client_response,
-    )
+    response = build_response(method, client_response)
     logger.debug(
         "operation=request_finished, request=%r, response=%r", request, response
     )
@@ -62,42 +70,27 @@ async def make_async_request(client, request):
     logger.debug("operation=request_started, request=%r", request)
     method = request.method
     client_method = getattr(client, method.lower())
+    # work on copies, the same request may be sent again on retry
+    headers = dict(request.headers)
     client_options = {
         "params": request.params,
-        "headers": request.headers,
+        "headers": headers,
         "timeout": request.timeout,
         **request.kwargs,
     }
     if method.lower() in ("post", "put", "patch"):
-        if request.headers.get("Content-Type") == "application/json":
+        if headers.get("Content-Type") == "application/json":
             client_options["json"] = request.body
-        elif request.headers.get("Content-Type") == "multipart/form-data":
-            files = request.body.pop("files")
-            client_options["files"] = files
-            if request.body:
-                client_options["data"] = request.body
-            request.headers.pop("Content-Type")
+        elif headers.get("Content-Type") == "multipart/form-data":
+            body = dict(request.body)
+            client_options["files"] = body.pop("files")
+            if body:
+                client_options["data"] = body
+            headers.pop("Content-Type")
         else:
             client_options["data"] = request.body
     client_response = await client_method(request.url, **client_options)
-    content_type = client_response.headers.get("Content-Type", "")
-    if "text" in content_type:
-        body = client_response.text
-    elif "json" in content_type:
-        body = client_response.text
-        if body:
-            body = client_response.json()
-    else:
-        body = client_response.content
-
-    response = Response(
-        url=str(client_response.url),
-        method=method,
-        body=body,
-        headers=client_response.headers,
-        status_code=client_response.status_code,
-        client_response=client_response,
-    )
+    response = build_response(method, client_response)
     logger.debug(
         "operation=request_finished, request=%r, response=%r", request, response
     )
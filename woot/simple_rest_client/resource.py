@@ -1,4 +1,5 @@
 import logging
+from functools import partial
 from types import MethodType
 
 import httpx
@@ -25,16 +26,42 @@ class BaseResource:
         append_slash=False,
         json_encode_body=False,
         ssl_verify=None,
+        client=None,
+        limits=None,
+        http2=False,
+        transport=None,
+        retry=None,
+        rate_limiter=None,
+        concurrency_limiter=None,
+        circuit_breakers=None,
+        hedging=None,
+        cache=None,
+        singleflight=None,
+        http_cache=None,
     ):
         self.api_root_url = api_root_url
         self.resource_name = resource_name
-        self.params = params or {}
-        self.headers = headers or {}
+        # own copies, the API hands the same dicts to every resource
+        self.params = dict(params or {})
+        self.headers = dict(headers or {})
         self.timeout = timeout or 3
         self.append_slash = append_slash
         self.json_encode_body = json_encode_body
         self.actions = self.actions or self.default_actions
         self.ssl_verify = True if ssl_verify is None else ssl_verify
+        self.client = client
+        self.limits = limits or httpx.Limits()
+        self.http2 = http2
+        self.transport = transport
+        self.retry = retry
+        self.action_retry = {}
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self.circuit_breakers = circuit_breakers
+        self.hedging = hedging
+        self.cache = cache
+        self.singleflight = singleflight
+        self.http_cache = http_cache
 
         if self.json_encode_body:
             self.headers["Content-Type"] = "application/json"
@@ -65,23 +92,72 @@ class BaseResource:
 
         if self.append_slash and not url.endswith("/"):
             url += "/"
-        if not self.api_root_url.endswith("/"):
-            self.api_root_url += "/"
+        api_root_url = self.api_root_url
+        if not api_root_url.endswith("/"):
+            api_root_url += "/"
         if url.startswith("/"):
             url = url.replace("/", "", 1)
-        return self.api_root_url + url
+        return api_root_url + url
+
+    def add_actions(self):
+        for action_name in self.actions.keys():
+            # skip actions the class already defines, e.g. generated by a
+            # metaclass, they don't need a method per instance
+            if getattr(type(self), action_name, None) is None:
+                self.add_action(action_name)
 
     def get_action_method(self, action_name):
         action = self.get_action(action_name)
         return action["method"]
 
+    def is_multipart(self, action_name, body):
+        return contains_bytes(body)
+
+    def get_retry_policy(self, action_name):
+        return self.action_retry.get(action_name, self.retry)
+
+    def get_circuit_breaker(self, action_name):
+        if self.circuit_breakers is None:
+            return None
+        action = self.get_action(action_name)
+        return self.circuit_breakers.get(
+            "{} {}".format(action["method"], action["url"])
+        )
+
+    def get_cache_ttl(self, action_name, request):
+        if self.cache is None or request.method != "GET":
+            return 0
+        return self.cache.get_ttl("{}.{}".format(self.resource_name, action_name))
+
+    def prepare_revalidation(self, request):
+        if self.http_cache is None or request.method != "GET":
+            return None
+        return self.http_cache.prepare(request)
+
+    def revalidate(self, request, response, cache_entry):
+        if self.http_cache is None or request.method != "GET":
+            return response
+        return self.http_cache.update(request, response, cache_entry)
+
+    def invalidate_cache(self, request):
+        # a write may change anything this resource returned before
+        if self.cache is not None and request.method != "GET":
+            self.cache.invalidate(self.resource_name)
+
 
 class Resource(BaseResource):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.client = httpx.Client(verify=self.ssl_verify)
-        for action_name in self.actions.keys():
-            self.add_action(action_name)
+        # the client is long-lived and may be shared with other resources,
+        # whoever created it is responsible for closing it
+        if self.client is None:
+            self.client = httpx.Client(
+                verify=self.ssl_verify,
+                limits=self.limits,
+                http2=self.http2,
+                transport=self.transport,
+            )
+        self.add_actions()
 
     def add_action(self, action_name):
         def action_method(
@@ -93,30 +169,65 @@ class Resource(BaseResource):
             action_name=action_name,
             **kwargs
         ):
-            url = self.get_action_full_url(action_name, *args)
-            method = self.get_action_method(action_name)
-            request = Request(
-                url=url,
-                method=method,
-                params=params or {},
-                body=body,
-                headers=headers or {},
-                timeout=self.timeout,
-                kwargs=kwargs,
+            return self.call_action(
+                action_name, *args, body=body, params=params, headers=headers, **kwargs
             )
-            request.params.update(self.params)
-            request.headers.update(self.headers)
-            return make_request(self.client, request)
 
         setattr(self, action_name, MethodType(action_method, self))
 
+    def call_action(
+        self, action_name, *args, body=None, params=None, headers=None, **kwargs
+    ):
+        url = self.get_action_full_url(action_name, *args)
+        method = self.get_action_method(action_name)
+        request = Request(
+            url=url,
+            method=method,
+            params=params or {},
+            body=body,
+            headers=headers or {},
+            timeout=self.timeout,
+            kwargs=kwargs,
+        )
+        request.params.update(self.params)
+        request.headers.update(self.headers)
+        if self.is_multipart(action_name, request.body):
+            request.headers.update({"Content-Type": "multipart/form-data"})
+        cache_ttl = self.get_cache_ttl(action_name, request)
+        if cache_ttl:
+            response = self.cache.get(request)
+            if response is not None:
+                return response
+        cache_entry = self.prepare_revalidation(request)
+        try:
+            response = make_request(
+                self.client,
+                request,
+                retry=self.get_retry_policy(action_name),
+                rate_limiter=self.rate_limiter,
+                breaker=self.get_circuit_breaker(action_name),
+            )
+        finally:
+            self.invalidate_cache(request)
+        response = self.revalidate(request, response, cache_entry)
+        if cache_ttl:
+            self.cache.set(request, response, cache_ttl, self.resource_name)
+        return response
+
 
 class AsyncResource(BaseResource):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.client = httpx.AsyncClient(verify=self.ssl_verify)
-        for action_name in self.actions.keys():
-            self.add_action(action_name)
+        # the client is long-lived and may be shared with other resources,
+        # whoever created it is responsible for closing it
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                verify=self.ssl_verify,
+                limits=self.limits,
+                http2=self.http2,
+                transport=self.transport,
+            )
+        self.add_actions()
 
     def add_action(self, action_name):
         async def action_method(
@@ -128,21 +239,54 @@ class AsyncResource(BaseResource):
             action_name=action_name,
             **kwargs
         ):
-            self.client = httpx.AsyncClient(verify=self.ssl_verify)
-            url = self.get_action_full_url(action_name, *args)
-            method = self.get_action_method(action_name)
-            request = Request(
-                url=url,
-                method=method,
-                params=params or {},
-                body=body,
-                headers=headers or {},
-                timeout=self.timeout,
-                kwargs=kwargs,
+            return await self.call_action(
+                action_name, *args, body=body, params=params, headers=headers, **kwargs
             )
-            request.params.update(self.params)
-            request.headers.update(self.headers)
-            async with self.client as client:
-                return await make_async_request(client, request)
 
         setattr(self, action_name, MethodType(action_method, self))
+
+    async def call_action(
+        self, action_name, *args, body=None, params=None, headers=None, **kwargs
+    ):
+        url = self.get_action_full_url(action_name, *args)
+        method = self.get_action_method(action_name)
+        request = Request(
+            url=url,
+            method=method,
+            params=params or {},
+            body=body,
+            headers=headers or {},
+            timeout=self.timeout,
+            kwargs=kwargs,
+        )
+        request.params.update(self.params)
+        request.headers.update(self.headers)
+        if self.is_multipart(action_name, request.body):
+            request.headers.update({"Content-Type": "multipart/form-data"})
+        cache_ttl = self.get_cache_ttl(action_name, request)
+        if cache_ttl:
+            response = self.cache.get(request)
+            if response is not None:
+                return response
+        cache_entry = self.prepare_revalidation(request)
+        send = partial(
+            make_async_request,
+            self.client,
+            request,
+            retry=self.get_retry_policy(action_name),
+            rate_limiter=self.rate_limiter,
+            concurrency=self.concurrency_limiter,
+            breaker=self.get_circuit_breaker(action_name),
+            hedging=self.hedging,
+        )
+        try:
+            if self.singleflight is not None and request.method == "GET":
+                response = await self.singleflight.do(request, send)
+            else:
+                response = await send()
+        finally:
+            self.invalidate_cache(request)
+        response = self.revalidate(request, response, cache_entry)
+        if cache_ttl:
+            self.cache.set(request, response, cache_ttl, self.resource_name)
+        return response
@@ -0,0 +1,87 @@
+""" Retry policy for failed requests."""
+import random
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+DEFAULT_RETRY_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+DEFAULT_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RetryPolicy:
+    """Decides whether a failed request is retried and how long to wait.
+
+    Only idempotent methods are retried by default, so e.g. creating a
+    message is never sent twice unless `retry_methods` says so. Delays use
+    exponential backoff with full jitter and honor `Retry-After`.
+
+    Counters are kept in `stats` (`retries` and `exhausted`), one policy can
+    be shared by all resources of a client.
+    """
+
+    def __init__(
+        self,
+        max_attempts=3,
+        backoff_factor=0.5,
+        max_backoff=30.0,
+        retry_statuses=DEFAULT_RETRY_STATUSES,
+        retry_methods=DEFAULT_RETRY_METHODS,
+    ):
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_methods = frozenset(m.upper() for m in retry_methods)
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    def should_retry(self, request, attempt, response=None):
+        """Check a failed attempt, pass `response` unless it was a connection error."""
+        if request.method.upper() not in self.retry_methods:
+            return False
+        if response is not None and response.status_code not in self.retry_statuses:
+            return False
+        if attempt >= self.max_attempts:
+            self._count("exhausted")
+            return False
+        self._count("retries")
+        return True
+
+    def get_delay(self, attempt, response=None):
+        delay = random.uniform(
+            0, min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1))
+        )
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                delay = max(delay, min(retry_after, self.max_backoff))
+        return delay
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def __repr__(self):
+        return (
+            f"RetryPolicy(max_attempts={self.max_attempts}, "
+            f"retry_methods={sorted(self.retry_methods)}, "
+            f"retry_statuses={sorted(self.retry_statuses)})"
+        )
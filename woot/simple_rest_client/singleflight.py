@@ -0,0 +1,78 @@
+""" Coalescing of identical concurrent async GET requests."""
+import asyncio
+import copy
+from collections import Counter
+
+from woot.simple_rest_client.cache import get_request_key
+from woot.simple_rest_client.deadline import get_deadline, run_without_deadline
+from woot.simple_rest_client.exceptions import DeadlineExceeded
+
+
+class SingleFlight:
+    """Share one in-flight GET between all callers asking for the same thing.
+
+    While a GET is in flight, identical GETs (same method, URL, params and
+    access token) wait for its response instead of sending their own, and
+    all of them get the result or the error. The request runs in its own
+    task: a caller that is cancelled stops waiting without affecting the
+    others, and the request is only cancelled when every caller waiting
+    for it is. The request itself runs without a deadline, every caller
+    waits for it within its own. `stats` counts calls, requests actually
+    sent and calls saved.
+    """
+
+    def __init__(self):
+        self.stats = Counter()
+        self._calls = {}
+
+    async def do(self, request, send):
+        """Return the response of `send()` or of an identical call in flight."""
+        key = get_request_key(request)
+        self.stats["calls"] += 1
+        call = self._calls.get(key)
+        leader = call is None
+        if leader:
+            call = self._calls[key] = {
+                # the leader's deadline must not cut the request short for
+                # the others
+                "task": run_without_deadline(asyncio.ensure_future, send()),
+                "waiting": 0,
+            }
+            call["task"].add_done_callback(lambda _: self._forget(key, call))
+            self.stats["requests"] += 1
+        else:
+            self.stats["saved"] += 1
+        call["waiting"] += 1
+        try:
+            response = await self.wait(call["task"], request)
+        except (asyncio.CancelledError, DeadlineExceeded):
+            if not call["task"].done() and call["waiting"] == 1:
+                # nobody else wants the result
+                call["task"].cancel()
+                self._forget(key, call)
+            raise
+        finally:
+            call["waiting"] -= 1
+        if leader:
+            return response
+        # every caller gets its own body to modify
+        return response._replace(body=copy.deepcopy(response.body))
+
+    async def wait(self, task, request):
+        deadline = get_deadline()
+        if deadline is None:
+            return await asyncio.shield(task)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), deadline.remaining())
+        except asyncio.TimeoutError:
+            if task.done():
+                raise
+            raise deadline.exceeded(request) from None
+
+    def _forget(self, key, call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    @property
+    def in_flight(self):
+        return len(self._calls)